@@ -3,19 +3,56 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 import os
 
-db = SQLAlchemy()
+from app.config import get_profile, register_sqlite_pragmas
+from app.db_routing import READ_BIND_KEY, RoutingSession, replica_url
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 
-def create_app():
+def create_app(test_config=None, config_name=None):
     app = Flask(__name__, template_folder=os.path.join(os.path.dirname(__file__), 'templates'))
     
     # Configuration
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///bank.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.from_object(get_profile(config_name))
+    if test_config:
+        app.config.update(test_config)
+    if app.config.get('DATABASE_READ_ROUTING'):
+        read_url = app.config.get('DATABASE_READ_URL') or replica_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if read_url:
+            read_bind = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}, url=read_url)
+            app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {}, **{READ_BIND_KEY: read_bind})
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        pragmas = app.config.get('SQLITE_PRAGMAS')
+        register_sqlite_pragmas(db.engine, pragmas)
+        if READ_BIND_KEY in db.engines:
+            # journal_mode is stored in the database file and owned by the
+            # primary; setting it on a mode=ro connection fails
+            read_pragmas = {name: value for name, value in (pragmas or {}).items() if name != 'journal_mode'}
+            register_sqlite_pragmas(db.engines[READ_BIND_KEY], dict(read_pragmas, query_only='ON'))
+    
+    # Per-request SQL accounting (Server-Timing header, N+1 warnings)
+    from app import query_stats
+    query_stats.init_app(app)
+    
+    # On-demand sampling profiler (X-Profile-Token header or admin toggle)
+    from app import profiler
+    profiler.init_app(app)
+    
+    # Prometheus /metrics with per-endpoint latency, errors and DB time
+    from app import metrics
+    metrics.init_app(app)
+    
+    # {% cache %} blocks for per-user dashboard widgets
+    from app import fragment_cache
+    fragment_cache.init_app(app)
+    
+    # Content-hashed, precompressed static files behind asset_url()
+    from app import assets
+    assets.init_app(app)
+    
     login_manager.init_app(app)
     
     login_manager.login_view = 'auth.login'
@@ -34,6 +71,7 @@ def create_app():
     from app.routes.advisor import advisor_bp
     from app.routes.admin import admin_bp
     from app.routes.savings_credit import savings_bp, credit_bp
+    from app.routes.stream import stream_bp
     from app.api_blueprint import api_bp
     
     app.register_blueprint(auth_bp)
@@ -48,10 +86,20 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(savings_bp)
     app.register_blueprint(credit_bp)
+    app.register_blueprint(stream_bp)
     app.register_blueprint(api_bp)
     
-    # Create tables
+    # CLI commands
+    from app.commands import ledger_cli, templates_cli
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(templates_cli)
+    
+    # Compiled templates shared across workers, optionally loaded at boot
+    from app import templating
+    templating.init_app(app)
+    
+    # Create tables (primary only; the read bind has no tables of its own)
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
     
     return app
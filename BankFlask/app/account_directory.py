@@ -0,0 +1,175 @@
+"""
+Account Directory - Allocates account numbers and answers "does it exist?"
+New numbers are 15 digits plus a Luhn check digit, handed out from blocks
+of 1,000 that are checked against the database with one range query per
+block. A Bloom filter over every known user and account number answers
+"does this exist" in memory; a "no" is confirmed only against rows added
+since the filter last looked.
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import Iterable, List
+
+from flask import current_app
+from sqlalchemy import literal, select, union_all
+
+from app import db
+from app.models import User, Account
+
+NUMBER_LENGTH = 16
+BLOCK_DIGITS = 3
+BLOCK_SIZE = 10 ** BLOCK_DIGITS
+_PREFIX_DIGITS = NUMBER_LENGTH - 1 - BLOCK_DIGITS
+_secure_random = random.SystemRandom()
+
+
+def luhn_check_digit(digits: str) -> str:
+    """Digit that makes `digits + check` pass the Luhn checksum"""
+    total = 0
+    for position, char in enumerate(reversed(digits)):
+        value = int(char)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def is_luhn_valid(number: str) -> bool:
+    return number.isdigit() and luhn_check_digit(number[:-1]) == number[-1]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1024)
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class AccountDirectory:
+    """Per-app allocator and membership index for user and account numbers.
+
+    The filter is loaded lazily and kept current by adding numbers this
+    process allocates. Before answering "no" it pulls in rows other
+    processes inserted since the last look (an id range probe per table),
+    at most once every `max_staleness` seconds; with the default of 0 it
+    never reports a real number as missing.
+    """
+
+    def __init__(self, error_rate: float = 0.01, max_staleness: float = 0.0):
+        self.error_rate = error_rate
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._filter = None
+        self._caught_up_at = 0.0
+        self._seen = {User: 0, Account: 0}
+        self._pool: List[str] = []
+
+    # ----- membership -----
+
+    def may_exist(self, number: str) -> bool:
+        """False only if no user or account has this number"""
+        number = (number or '').strip()
+        if len(number) > 20 or not number.isdigit():
+            return False
+        with self._lock:
+            if self._filter is None:
+                self._load()
+            if number in self._filter:
+                return True
+            if time.monotonic() - self._caught_up_at < self.max_staleness:
+                return False
+            self._catch_up()
+            return number in self._filter
+
+    def _load(self) -> None:
+        total = sum(db.session.query(db.func.count(model.id)).scalar() for model in self._seen)
+        self._filter = BloomFilter(total * 2, self.error_rate)
+        self._seen = {model: 0 for model in self._seen}
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        # One round trip: a primary-key range probe per table past the last id seen
+        stmt = union_all(*(
+            select(literal(model.__tablename__), model.id, model.account_number).where(model.id > last_id)
+            for model, last_id in self._seen.items()
+        ))
+        models = {model.__tablename__: model for model in self._seen}
+        for table, row_id, number in db.session.execute(stmt):
+            self._filter.add(number)
+            model = models[table]
+            self._seen[model] = max(self._seen[model], row_id)
+        self._caught_up_at = time.monotonic()
+        if self._filter.count > self._filter.capacity:
+            self._load()
+
+    def _remember(self, numbers: Iterable[str]) -> None:
+        if self._filter is not None:
+            for number in numbers:
+                self._filter.add(number)
+
+    # ----- allocation -----
+
+    def allocate(self, count: int = 1) -> List[str]:
+        """`count` unused, Luhn-valid 16-digit numbers"""
+        with self._lock:
+            while len(self._pool) < count:
+                self._pool.extend(self._reserve_block())
+            numbers, self._pool = self._pool[:count], self._pool[count:]
+            self._remember(numbers)
+        return numbers
+
+    def _reserve_block(self) -> List[str]:
+        """Fresh numbers sharing a random 12-digit prefix, minus any in use.
+
+        With 10^12 prefixes two processes picking the same block is
+        vanishingly unlikely, and the unique indexes remain the backstop.
+        """
+        prefix = ''.join(_secure_random.choices('0123456789', k=_PREFIX_DIGITS))
+        low, high = prefix + '0' * (BLOCK_DIGITS + 1), prefix + '9' * (BLOCK_DIGITS + 1)
+        taken = set()
+        for model in (User, Account):
+            taken.update(db.session.scalars(
+                select(model.account_number).where(model.account_number.between(low, high))
+            ))
+        block = []
+        for serial in range(BLOCK_SIZE):
+            body = f'{prefix}{serial:0{BLOCK_DIGITS}d}'
+            number = body + luhn_check_digit(body)
+            if number not in taken:
+                block.append(number)
+        _secure_random.shuffle(block)
+        return block
+
+
+def account_directory() -> AccountDirectory:
+    """The current app's directory, created on first use"""
+    directory = current_app.extensions.get('account_directory')
+    if directory is None:
+        directory = current_app.extensions.setdefault('account_directory', AccountDirectory(
+            max_staleness=current_app.config.get('ACCOUNT_DIRECTORY_MAX_STALENESS', 0.0)
+        ))
+    return directory
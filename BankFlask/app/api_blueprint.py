@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+from app import dashboard_bundle
+from app.conditional import etag_by_data_version
+
 load_dotenv()
 
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
@@ -416,6 +419,31 @@ def get_admin_analytics():
     }), 200
 
 
+# ===== DASHBOARD BUNDLE =====
+
+@api_bp.route('/dashboard', methods=['GET'])
+@login_required
+@etag_by_data_version
+def dashboard():
+    """Dashboard widgets in one round trip, read from one database snapshot.
+
+    ?sections=balance,transactions,... picks the sections (default: all);
+    ?limit= sets how many recent transactions to include (1-100, default 10).
+    """
+    requested = request.args.get('sections')
+    sections = [name.strip() for name in requested.split(',') if name.strip()] if requested \
+        else list(dashboard_bundle.SECTIONS)
+    unknown = [name for name in sections if name not in dashboard_bundle.SECTIONS]
+    if unknown:
+        return jsonify({
+            'error': f'Unknown section(s): {", ".join(unknown)}',
+            'sections': list(dashboard_bundle.SECTIONS)
+        }), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    
+    return jsonify(dashboard_bundle.build(current_user.id, sections, limit)), 200
+
+
 # ===== HEALTH CHECK =====
 
 @api_bp.route('/health', methods=['GET'])
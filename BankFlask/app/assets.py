@@ -0,0 +1,127 @@
+"""
+Static Assets - Content-hashed, precompressed files with far-future caching
+At startup every file under static/ is hashed and compressed (gzip, plus
+brotli when the optional `brotli` package is installed). Templates link to
+asset_url('css/style.css'), which yields /static/css/style.<hash>.css; that
+URL is served from memory with the best encoding the client accepts and
+Cache-Control: immutable, since its content can never change. Plain names
+keep working through Flask's normal static handling.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, Optional
+
+from flask import Response, request, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+HASH_LENGTH = 12
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class Asset:
+    """One static file: its fingerprinted name and encoded bodies"""
+
+    def __init__(self, filename: str, path: str):
+        with open(path, 'rb') as handle:
+            body = handle.read()
+        self.filename = filename
+        self.mtime = os.stat(path).st_mtime
+        self.digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        stem, ext = os.path.splitext(filename)
+        self.hashed_name = f'{stem}.{self.digest}{ext}'
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self.bodies: Dict[str, bytes] = {'identity': body}
+        for encoding, compressed in (('gzip', gzip.compress(body, 9, mtime=0)),
+                                     ('br', brotli.compress(body) if brotli else None)):
+            if compressed is not None and len(compressed) < len(body):
+                self.bodies[encoding] = compressed
+
+
+class AssetRegistry:
+    """Fingerprints for every file under the static folder"""
+
+    def __init__(self, static_folder: str, auto_reload: bool = False):
+        self.static_folder = static_folder
+        self.auto_reload = auto_reload
+        self._by_name: Dict[str, Asset] = {}
+        self._by_hashed_name: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def register_all(self) -> int:
+        """Hash and compress every static file; returns how many were registered"""
+        count = 0
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                relative = os.path.relpath(os.path.join(root, name), self.static_folder)
+                self.register(relative.replace(os.sep, '/'))
+                count += 1
+        return count
+
+    def register(self, filename: str) -> Optional[Asset]:
+        path = os.path.join(self.static_folder, *filename.split('/'))
+        if not os.path.isfile(path):
+            return None
+        asset = Asset(filename, path)
+        with self._lock:
+            self._by_name[filename] = asset
+            self._by_hashed_name[asset.hashed_name] = asset
+        return asset
+
+    def lookup(self, filename: str) -> Optional[Asset]:
+        asset = self._by_name.get(filename)
+        if self.auto_reload:
+            path = os.path.join(self.static_folder, *filename.split('/'))
+            if asset is None or (os.path.isfile(path) and os.stat(path).st_mtime != asset.mtime):
+                asset = self.register(filename)
+        return asset
+
+    def hashed(self, hashed_name: str) -> Optional[Asset]:
+        return self._by_hashed_name.get(hashed_name)
+
+    def url(self, filename: str, **values) -> str:
+        """url_for('static', ...) for the fingerprinted name, or the plain one if unknown"""
+        asset = self.lookup(filename)
+        return url_for('static', filename=asset.hashed_name if asset else filename, **values)
+
+
+def _encoding_for(asset: Asset) -> str:
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in asset.bodies and accepted[encoding]:
+            return encoding
+    return 'identity'
+
+
+def serve(asset: Asset) -> Response:
+    encoding = _encoding_for(asset)
+    response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(f'{asset.digest}-{encoding}')
+    return response.make_conditional(request)
+
+
+def init_app(app) -> AssetRegistry:
+    registry = AssetRegistry(app.static_folder, auto_reload=app.config.get('ASSETS_AUTO_RELOAD', False))
+    registry.register_all()
+    app.extensions['assets'] = registry
+    app.add_template_global(registry.url, 'asset_url')
+
+    static_view = app.view_functions['static']
+
+    def static(filename):
+        asset = registry.hashed(filename)
+        return serve(asset) if asset is not None else static_view(filename=filename)
+
+    app.view_functions['static'] = static
+    return registry
@@ -0,0 +1,73 @@
+"""
+CLI Commands - Maintenance jobs run via `flask ledger ...` and `flask templates ...`
+"""
+
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app import rollups, templating
+from app.imports import import_file, CHUNK_SIZE
+from app.ledger import LedgerService
+from app.snapshots import take_snapshots
+
+ledger_cli = AppGroup('ledger', help='Ledger maintenance commands.')
+templates_cli = AppGroup('templates', help='Template cache commands.')
+
+
+@ledger_cli.command('backfill-postings')
+def backfill_postings():
+    """Create postings for transactions recorded before the postings table existed."""
+    inserted = LedgerService.backfill_postings()
+    click.echo(f'Inserted {inserted} postings')
+
+
+@ledger_cli.command('snapshot-balances')
+@click.option('--date', 'snapshot_date', default=None,
+              help='Day to snapshot as YYYY-MM-DD (defaults to yesterday, UTC).')
+def snapshot_balances(snapshot_date):
+    """Record end-of-day balances for every account (run nightly)."""
+    if snapshot_date:
+        snapshot_date = datetime.strptime(snapshot_date, '%Y-%m-%d').date()
+    written = take_snapshots(snapshot_date)
+    click.echo(f'Wrote {written} balance snapshots')
+
+
+@ledger_cli.command('backfill-rollups')
+def backfill_rollups():
+    """Rebuild the monthly spending rollups from the transactions table."""
+    written = rollups.rebuild()
+    click.echo(f'Wrote {written} monthly rollup rows')
+
+
+@ledger_cli.command('import-transactions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ofx']), default=None,
+              help='File format (defaults to the file extension).')
+@click.option('--chunk-size', default=CHUNK_SIZE, show_default=True, help='Rows per insert batch.')
+def import_transactions(path, fmt, chunk_size):
+    """Bulk-load historical transactions from a CSV or OFX file."""
+    fmt = fmt or ('ofx' if path.lower().endswith(('.ofx', '.qfx')) else 'csv')
+
+    def report(result):
+        click.echo(f'  {result.rows:>10,} rows  {result.inserted:>10,} inserted  '
+                   f'{result.skipped:>8,} skipped  {result.rows_per_second:>10,.0f} rows/s')
+
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        result = import_file(stream, fmt, chunk_size=chunk_size, progress=report)
+
+    for line, message in result.errors:
+        click.echo(f'  line {line}: {message}', err=True)
+    click.echo(f'Imported {result.inserted:,} of {result.rows:,} rows in {result.elapsed:.2f}s')
+
+
+@templates_cli.command('warm')
+def warm_templates():
+    """Compile every template into the bytecode cache (run at deploy time)."""
+    loaded, failed = templating.warm_up(current_app)
+    stats = templating.stats(current_app)
+    click.echo(f"Compiled {loaded} templates into {stats['directory']} ({stats['entries']} cached)")
+    for name in failed:
+        click.echo(f'  failed: {name}', err=True)
@@ -0,0 +1,46 @@
+"""
+Conditional GET - Weak ETags for per-user JSON polling endpoints
+The ETag is derived from the user's data version (see app/summary_cache.py),
+so a poll whose If-None-Match still matches is answered 304 before the view
+runs any of its queries.
+"""
+
+import time
+import uuid
+from functools import wraps
+
+from flask import current_app, make_response, request
+from flask_login import current_user
+
+from app.summary_cache import summary_cache
+
+# Versions are counted per process: the instance token keeps one worker's
+# ETag from ever matching another's, and the epoch (one SUMMARY_CACHE_TTL
+# long) bounds how long a change committed by another worker can go
+# unnoticed, as it does for the summary cache itself.
+_INSTANCE = uuid.uuid4().hex[:8]
+
+
+def data_etag(user_id: int) -> str:
+    epoch = int(time.time() // max(current_app.config.get('SUMMARY_CACHE_TTL', 30.0), 1.0))
+    return f'{_INSTANCE}-{user_id}-{summary_cache().version(user_id)}-{epoch}'
+
+
+def etag_by_data_version(view):
+    """Answer If-None-Match with 304 while the current user's data is unchanged.
+
+    Goes under @login_required.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = data_etag(current_user.id)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,160 @@
+"""
+Configuration Profiles - Named settings for development, testing and production
+The database URI comes from DATABASE_URL; SQLite connections get WAL and
+the other pragmas below applied as soon as they are opened.
+"""
+
+import os
+from typing import Any, Dict
+
+from sqlalchemy import event
+
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+class Config:
+    """Settings shared by every profile"""
+    PROFILE_NAME = 'base'
+    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///bank.db')
+    # Engine for @read_only views; derived from a file-backed SQLite URI if unset
+    DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
+    DATABASE_READ_ROUTING = os.getenv('DATABASE_READ_ROUTING', '1') == '1'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Per-request SQL accounting (app/query_stats.py)
+    QUERY_STATS_HEADER = os.getenv('QUERY_STATS_HEADER', '1') == '1'
+    QUERY_COUNT_WARN_THRESHOLD = _int_env('QUERY_COUNT_WARN_THRESHOLD', 30)
+    QUERY_REPEAT_WARN_THRESHOLD = _int_env('QUERY_REPEAT_WARN_THRESHOLD', 5)
+    SLOW_QUERY_THRESHOLD_MS = _int_env('SLOW_QUERY_THRESHOLD_MS', 100)
+    SLOW_QUERY_MAX_ENTRIES = _int_env('SLOW_QUERY_MAX_ENTRIES', 200)
+    # On-demand request profiling (app/profiler.py); the header trigger is
+    # off unless PROFILER_TOKEN is set
+    PROFILER_TOKEN = os.getenv('PROFILER_TOKEN')
+    PROFILER_DIR = os.getenv('PROFILER_DIR')  # defaults to <instance>/profiles
+    PROFILER_INTERVAL_MS = _int_env('PROFILER_INTERVAL_MS', 5)
+    PROFILER_MIN_INTERVAL_MS = 1
+    PROFILER_MAX_PER_MINUTE = _int_env('PROFILER_MAX_PER_MINUTE', 10)
+    PROFILER_KEEP = _int_env('PROFILER_KEEP', 50)
+    # /metrics (app/metrics.py): optional bearer token, and a directory shared
+    # by worker processes so any of them can report the combined totals
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    # Seconds a "no such account" answer may lag numbers created by other workers
+    ACCOUNT_DIRECTORY_MAX_STALENESS = float(os.getenv('ACCOUNT_DIRECTORY_MAX_STALENESS', '1.0'))
+    # Per-user summaries (app/summary_cache.py); the TTL bounds how long a
+    # change committed by another worker process can go unseen
+    SUMMARY_CACHE_MAX_ENTRIES = _int_env('SUMMARY_CACHE_MAX_ENTRIES', 2048)
+    SUMMARY_CACHE_TTL = float(os.getenv('SUMMARY_CACHE_TTL', '30'))
+    # Rendered {% cache %} template fragments (app/fragment_cache.py); the
+    # TTL is the default for blocks that do not give their own
+    FRAGMENT_CACHE_MAX_BYTES = _int_env('FRAGMENT_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+    FRAGMENT_CACHE_TTL = float(os.getenv('FRAGMENT_CACHE_TTL', '60'))
+    # /stream/events (app/events.py): seconds between heartbeat comments,
+    # events buffered per connection, and open streams allowed per user
+    EVENT_STREAM_HEARTBEAT = float(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+    EVENT_STREAM_QUEUE_SIZE = _int_env('EVENT_STREAM_QUEUE_SIZE', 100)
+    EVENT_STREAM_MAX_PER_USER = _int_env('EVENT_STREAM_MAX_PER_USER', 5)
+    # Content-hashed static files (app/assets.py); with auto-reload on, an
+    # edited file gets a new hash on the next render instead of at restart
+    ASSETS_AUTO_RELOAD = os.getenv('ASSETS_AUTO_RELOAD', '0') == '1'
+    # Compiled Jinja templates (app/templating.py), kept in
+    # <instance>/jinja_cache unless a directory is given; JINJA_WARMUP loads
+    # every template in create_app instead of on its first render
+    JINJA_BYTECODE_CACHE = os.getenv('JINJA_BYTECODE_CACHE', '1') == '1'
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR')
+    JINJA_WARMUP = os.getenv('JINJA_WARMUP', '0') == '1'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': _int_env('DB_POOL_SIZE', 5),
+        'max_overflow': _int_env('DB_MAX_OVERFLOW', 10),
+        'pool_recycle': _int_env('DB_POOL_RECYCLE', 1800),
+    }
+    # Applied to every new SQLite connection, in this order. journal_mode is
+    # persistent per database file; the rest are per connection.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': _int_env('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'cache_size': -_int_env('SQLITE_CACHE_KB', 64000),
+        'mmap_size': _int_env('SQLITE_MMAP_BYTES', 256 * 1024 * 1024),
+    }
+
+
+class DevelopmentConfig(Config):
+    PROFILE_NAME = 'development'
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO') == '1'
+    ASSETS_AUTO_RELOAD = os.getenv('ASSETS_AUTO_RELOAD', '1') == '1'
+
+
+class TestingConfig(Config):
+    PROFILE_NAME = 'testing'
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    # In-memory SQLite runs on a StaticPool, which takes no sizing options
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    ACCOUNT_DIRECTORY_MAX_STALENESS = 0.0
+    # Compiled templates would otherwise land in the source tree's instance/
+    JINJA_BYTECODE_CACHE = False
+
+
+class ProductionConfig(Config):
+    PROFILE_NAME = 'production'
+    SQLALCHEMY_ENGINE_OPTIONS = dict(Config.SQLALCHEMY_ENGINE_OPTIONS, pool_pre_ping=True)
+    JINJA_WARMUP = os.getenv('JINJA_WARMUP', '1') == '1'
+
+
+PROFILES = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_profile(name: str = None) -> type:
+    """Profile class for `name`, defaulting to $APP_CONFIG or 'development'"""
+    name = name or os.getenv('APP_CONFIG', 'development')
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown config profile '{name}' (expected one of {', '.join(PROFILES)})")
+
+
+def register_sqlite_pragmas(engine, pragmas: Dict[str, Any]) -> None:
+    """Run the given PRAGMAs on every connection the engine opens"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def engine_diagnostics(engine, profile: str, pragmas: Dict[str, Any]) -> Dict[str, Any]:
+    """Effective engine, pool and pragma settings, read back from a live connection"""
+    pool = engine.pool
+    info = {
+        'profile': profile,
+        'url': engine.url.render_as_string(hide_password=True),
+        'dialect': engine.dialect.name,
+        'pool': {
+            'class': type(pool).__name__,
+            'size': pool.size() if hasattr(pool, 'size') else None,
+            'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+            'overflow': pool.overflow() if hasattr(pool, 'overflow') else None,
+            'recycle': pool._recycle,
+            'pre_ping': pool._pre_ping,
+        },
+    }
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as conn:
+            info['pragmas'] = {
+                name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+                for name in pragmas
+            }
+    return info
@@ -0,0 +1,122 @@
+"""
+Dashboard Bundle - Every dashboard widget in one consistent JSON document
+The client names the sections it wants; they are all read from one
+database snapshot on one connection, so the balance, the recent
+transactions and the health score always describe the same moment.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable
+
+from sqlalchemy import func, select
+
+from app import db
+from app.db_routing import begin_snapshot
+from app.financial_summary import FinancialSummary, health_score
+from app.models import Account, Transaction, AIInsight
+
+
+def _accounts(context: dict) -> list:
+    if 'accounts' not in context:
+        context['accounts'] = db.session.execute(
+            select(Account.id, Account.account_type, Account.account_number, Account.balance)
+            .where(Account.user_id == context['user_id'])
+            .order_by(Account.id)
+        ).all()
+    return context['accounts']
+
+
+def _month(context: dict) -> FinancialSummary:
+    if 'month' not in context:
+        context['month'] = FinancialSummary.compute(context['user_id'], 'month', context['now'])
+    return context['month']
+
+
+def balance(context: dict) -> dict:
+    accounts = _accounts(context)
+    return {
+        'total_balance': sum(row.balance for row in accounts),
+        'accounts': [{'id': row.id, 'type': row.account_type, 'number': row.account_number,
+                      'balance': row.balance} for row in accounts]
+    }
+
+
+def transactions(context: dict) -> list:
+    rows = db.session.execute(
+        select(Transaction.id, Transaction.amount, Transaction.transaction_type,
+               Transaction.description, Transaction.created_at)
+        .where(Transaction.user_id == context['user_id'])
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(context['limit'])
+    ).all()
+    return [{
+        'id': row.id,
+        'amount': row.amount,
+        'type': row.transaction_type,
+        'description': row.description,
+        'created_at': row.created_at.isoformat()
+    } for row in rows]
+
+
+def recommendations(context: dict) -> list:
+    insights = db.session.execute(
+        select(AIInsight.id, AIInsight.insight_type, AIInsight.title, AIInsight.description,
+               AIInsight.confidence, AIInsight.action_items)
+        .where(AIInsight.user_id == context['user_id'])
+        .limit(5)
+    ).all()
+    return [{
+        'id': row.id,
+        'type': row.insight_type,
+        'title': row.title,
+        'description': row.description,
+        'confidence': row.confidence,
+        'actions': row.action_items or []
+    } for row in insights]
+
+
+def health(context: dict) -> dict:
+    total_balance = sum(row.balance for row in _accounts(context))
+    spending = _month(context).spending
+    score = health_score(total_balance, spending)
+    return {
+        'score': int(score),
+        'balance': total_balance,
+        'spending': spending,
+        'trend': 'improving' if score > 70 else 'stable' if score > 50 else 'declining'
+    }
+
+
+def summary(context: dict) -> dict:
+    return _month(context).to_dict()
+
+
+def unread_insights(context: dict) -> int:
+    return db.session.execute(
+        select(func.count(AIInsight.id)).where(AIInsight.user_id == context['user_id'],
+                                               AIInsight.is_read.is_(False))
+    ).scalar()
+
+
+SECTIONS: Dict[str, Callable[[dict], object]] = {
+    'balance': balance,
+    'transactions': transactions,
+    'recommendations': recommendations,
+    'health_score': health,
+    'summary': summary,
+    'unread_insights': unread_insights,
+}
+
+
+def build(user_id: int, sections: Iterable[str], limit: int = 10) -> dict:
+    """The requested sections, read from one snapshot of the database.
+
+    Raises KeyError for an unknown section name.
+    """
+    builders = [(name, SECTIONS[name]) for name in sections]
+    begin_snapshot(db.session)
+    context = {'user_id': user_id, 'limit': limit, 'now': datetime.utcnow()}
+    bundle = {'as_of': context['now'].isoformat()}
+    for name, builder in builders:
+        bundle[name] = builder(context)
+    return bundle
@@ -0,0 +1,87 @@
+"""
+Read/Write Routing - Sends read-only views to a separate read engine
+Views marked @read_only run their SELECTs on the 'replica' bind (a second
+SQLite connection pool opened mode=ro, or DATABASE_READ_URL). Flushes,
+DML and anything after the first write in a session stay on the primary,
+as do reads pinned to one snapshot with begin_snapshot().
+"""
+
+from functools import wraps
+from typing import Optional
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_BIND_KEY = 'replica'
+SNAPSHOT = 'snapshot'
+
+
+def replica_url(primary_url: str) -> Optional[str]:
+    """Read-only URL for the same SQLite file, or None if there isn't one.
+
+    In-memory databases cannot be shared between pools, so they get no
+    read engine and every query stays on the primary.
+    """
+    url = make_url(primary_url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    database = url.database[5:] if url.query.get('uri') else url.database
+    return str(url.set(database=f'file:{database}', query={'mode': 'ro', 'uri': 'true'}))
+
+
+def read_only(view):
+    """Route the view's reads to the read engine.
+
+    The flag lives on `g`, so it also covers streamed responses generated
+    under stream_with_context after the view returns.
+    """
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return decorated
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that can send plain SELECTs to the read bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not self.info.get('has_written')
+                and not self.info.get(SNAPSHOT) and getattr(clause, 'is_select', False) and self._reads_routed()):
+            engine = self._db.engines.get(READ_BIND_KEY)
+            if engine is not None:
+                return engine
+        if clause is not None and getattr(clause, 'is_dml', False):
+            self.info['has_written'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    @staticmethod
+    def _reads_routed() -> bool:
+        return has_app_context() and g.get('db_read_only', False)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    # Read-your-writes: once this session has changed something, a lagging
+    # replica could miss it, so the rest of the request uses the primary.
+    session.info['has_written'] = True
+
+
+def begin_snapshot(session) -> None:
+    """Make the session's remaining reads see one consistent state of the primary.
+
+    pysqlite only opens a transaction before DML, so each SELECT would
+    otherwise see the latest commit; an explicit BEGIN holds the snapshot
+    taken at the next read until the session ends. Other backends restart
+    the session's transaction at REPEATABLE READ.
+    """
+    session.info[SNAPSHOT] = True
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite':
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
+    else:
+        session.rollback()
+        session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
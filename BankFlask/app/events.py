@@ -0,0 +1,174 @@
+"""
+Live Events - In-process pub/sub behind the /stream/events SSE endpoint
+Balance changes, new transactions and new AI insights are queued on the
+session as they are flushed and published to the owner's open streams
+once the commit succeeds. Each stream has a bounded queue; a client that
+falls too far behind gets a single 'resync' event telling it to refetch.
+Streams only see commits made by the worker process they are connected to.
+"""
+
+import itertools
+import queue
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+
+from app.db_routing import RoutingSession
+from app.metrics import register_gauge
+from app.models import Account, Transaction, AIInsight
+
+Event = Tuple[int, str, dict]
+_PENDING = 'live_events_pending'
+
+
+class Subscription:
+    """One open stream: a bounded queue of (id, type, data) events"""
+
+    def __init__(self, user_id: int, max_queued: int):
+        self.user_id = user_id
+        self.queue: 'queue.Queue[Event]' = queue.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+    def push(self, item: Event) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # The client fell behind: replace the backlog with one resync
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    break
+            self.queue.put_nowait((item[0], 'resync', {}))
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Per-user fan-out to every open subscription"""
+
+    def __init__(self, max_queued: int = 100, max_per_user: int = 5):
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        """A new subscription, or None if the user already has too many"""
+        with self._lock:
+            streams = self._subscribers.setdefault(user_id, set())
+            if len(streams) >= self.max_per_user:
+                return None
+            subscription = Subscription(user_id, self.max_queued)
+            streams.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            streams = self._subscribers.get(subscription.user_id)
+            if streams is not None:
+                streams.discard(subscription)
+                if not streams:
+                    del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: int, event_type: str, data: dict) -> None:
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        item = (next(self._ids), event_type, data)
+        for subscription in streams:
+            subscription.push(item)
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(streams) for streams in self._subscribers.values())
+
+
+def event_bus() -> EventBus:
+    """The current app's bus, created on first use"""
+    bus = current_app.extensions.get('event_bus')
+    if bus is None:
+        bus = current_app.extensions.setdefault('event_bus', EventBus(
+            max_queued=current_app.config.get('EVENT_STREAM_QUEUE_SIZE', 100),
+            max_per_user=current_app.config.get('EVENT_STREAM_MAX_PER_USER', 5)
+        ))
+    return bus
+
+
+register_gauge('bank_event_streams_open', 'Open /stream/events connections in this process.',
+               lambda: event_bus().connections())
+
+
+# ----- payloads -----
+
+def transaction_event(txn: Transaction) -> dict:
+    return {
+        'id': txn.id,
+        'amount': txn.amount,
+        'type': txn.transaction_type,
+        'description': txn.description,
+        'created_at': txn.created_at.isoformat() if txn.created_at else None,
+    }
+
+
+def insight_event(insight: AIInsight) -> dict:
+    return {
+        'id': insight.id,
+        'type': insight.insight_type,
+        'title': insight.title,
+        'confidence': insight.confidence,
+    }
+
+
+def balance_event(account_id: int, account_number: str, balance: float) -> dict:
+    return {'account_id': account_id, 'account_number': account_number, 'balance': round(balance, 2)}
+
+
+# ----- session wiring -----
+
+def listening(user_id: int) -> bool:
+    """Whether anyone in this process is streaming this user's events"""
+    return has_app_context() and event_bus().has_subscribers(user_id)
+
+
+def queue_event(session, user_id: int, event_type: str, data: dict) -> None:
+    """Publish `data` to the user's streams once the session commits"""
+    session.info.setdefault(_PENDING, []).append((user_id, event_type, data))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_events(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Transaction) and listening(obj.user_id):
+            queue_event(session, obj.user_id, 'transaction', transaction_event(obj))
+        elif isinstance(obj, AIInsight) and listening(obj.user_id):
+            queue_event(session, obj.user_id, 'insight', insight_event(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Account) and listening(obj.user_id) \
+                and inspect(obj).attrs.balance.history.has_changes():
+            queue_event(session, obj.user_id, 'balance',
+                        balance_event(obj.id, obj.account_number, obj.balance))
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_events(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending and has_app_context():
+        bus = event_bus()
+        for user_id, event_type, data in pending:
+            bus.publish(user_id, event_type, data)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _drop_events(session):
+    session.info.pop(_PENDING, None)
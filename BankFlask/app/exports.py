@@ -0,0 +1,103 @@
+"""
+Statement Export - Streams transaction history as CSV or NDJSON
+Rows come from a server-side cursor (yield_per) and are written out in
+small chunks, so memory stays flat however long the history is.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Transaction, Posting
+
+EXPORT_COLUMNS = ('transaction_id', 'created_at', 'type', 'status', 'amount',
+                  'description', 'from_account', 'to_account')
+BATCH_SIZE = 1000
+
+
+def export_rows(user_id: int, account_id: Optional[int] = None,
+                start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[tuple]:
+    """Yield export rows oldest-first for a user's transactions or for one account.
+
+    With account_id the rows come from that account's postings, so incoming
+    transfers are included and amounts are signed. `end` is exclusive.
+    """
+    if account_id is not None:
+        created = Posting.created_at
+        stmt = (
+            select(Transaction.transaction_id, Posting.created_at, Transaction.transaction_type,
+                   Transaction.status, Posting.amount, Transaction.description,
+                   Transaction.from_account, Transaction.to_account)
+            .join(Posting.transaction)
+            .where(Posting.account_id == account_id)
+            .order_by(Posting.created_at, Posting.id)
+        )
+    else:
+        created = Transaction.created_at
+        stmt = (
+            select(Transaction.transaction_id, Transaction.created_at, Transaction.transaction_type,
+                   Transaction.status, Transaction.amount, Transaction.description,
+                   Transaction.from_account, Transaction.to_account)
+            .where(Transaction.user_id == user_id)
+            .order_by(Transaction.created_at, Transaction.id)
+        )
+    if start is not None:
+        stmt = stmt.where(created >= start)
+    if end is not None:
+        stmt = stmt.where(created < end)
+
+    result = db.session.execute(stmt.execution_options(yield_per=BATCH_SIZE))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def to_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    """Encode rows as CSV, header first, one chunk per BATCH_SIZE rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_serialize(value) for value in row])
+        pending += 1
+        if pending >= BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def to_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON objects.
+
+    The first row is sent on its own so the client sees bytes right away;
+    after that rows go out in chunks of BATCH_SIZE.
+    """
+    lines = []
+    flush_at = 1
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, map(_serialize, row)))))
+        if len(lines) >= flush_at:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+            flush_at = BATCH_SIZE
+    if lines:
+        yield '\n'.join(lines) + '\n'
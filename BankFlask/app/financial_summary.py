@@ -0,0 +1,214 @@
+"""
+Financial Summary - A user's spending, deposits and counts over a window
+Computed by one grouped query (transaction type x status) instead of
+loading the window's transactions into Python. The current calendar
+month is read from the monthly rollups; rolling windows use the
+(user_id, created_at) index on transactions. Results are kept in the
+summary cache until the user's data changes.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Transaction, MonthlyRollup
+from app.rollups import SPENDING_TYPES, DEPOSIT_TYPES, month_key, recent_months
+from app.summary_cache import cached
+
+MONTH = 'month'
+Window = Union[str, int, timedelta]
+
+GRANULARITIES = ('day', 'week', 'month')
+MAX_PERIODS = {'day': 366, 'week': 156, 'month': 120}
+
+
+class FinancialSummary:
+    """Totals for one user, keyed by (transaction_type, status)"""
+
+    def __init__(self, user_id: int, start: datetime, end: datetime,
+                 groups: Dict[Tuple[str, str], Tuple[float, int]]):
+        self.user_id = user_id
+        self.start = start
+        self.end = end
+        self.groups = groups
+
+    @classmethod
+    def for_user(cls, user_id: int, window: Window = MONTH,
+                 now: Optional[datetime] = None) -> 'FinancialSummary':
+        """Summary for the current calendar month ('month') or the last N days.
+
+        `window` may be 'month', a number of days, or a timedelta. Without
+        an explicit `now` the result comes from the summary cache.
+        """
+        if now is not None:
+            return cls.compute(user_id, window, now)
+        now = datetime.utcnow()
+        if window == MONTH:
+            key = ('financial_summary', MONTH, month_key(now))
+        else:
+            span = window if isinstance(window, timedelta) else timedelta(days=int(window))
+            key = ('financial_summary', span.total_seconds())
+        return cached(user_id, key, lambda: cls.compute(user_id, window, now))
+
+    @classmethod
+    def compute(cls, user_id: int, window: Window, now: datetime) -> 'FinancialSummary':
+        """Run the grouped query for the window ending at `now`"""
+        if window == MONTH:
+            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            rows = db.session.query(
+                MonthlyRollup.transaction_type, MonthlyRollup.status,
+                func.sum(MonthlyRollup.total_amount), func.sum(MonthlyRollup.transaction_count)
+            ).filter(
+                MonthlyRollup.user_id == user_id,
+                MonthlyRollup.month == month_key(now)
+            ).group_by(MonthlyRollup.transaction_type, MonthlyRollup.status).all()
+        else:
+            span = window if isinstance(window, timedelta) else timedelta(days=int(window))
+            start = now - span
+            status = func.coalesce(Transaction.status, 'COMPLETED')
+            rows = db.session.query(
+                Transaction.transaction_type, status,
+                func.sum(Transaction.amount), func.count(Transaction.id)
+            ).filter(
+                Transaction.user_id == user_id,
+                Transaction.created_at >= start,
+                Transaction.created_at <= now
+            ).group_by(Transaction.transaction_type, status).all()
+
+        groups = {(txn_type, status): (total or 0.0, count or 0) for txn_type, status, total, count in rows}
+        return cls(user_id, start, now, groups)
+
+    # ----- totals -----
+
+    def amount(self, types: Optional[Iterable[str]] = None, status: Optional[str] = None) -> float:
+        """Sum of amounts, optionally limited to some types and/or one status"""
+        types = None if types is None else set(types)
+        return sum(total for (txn_type, txn_status), (total, _) in self.groups.items()
+                   if (types is None or txn_type in types) and (status is None or txn_status == status))
+
+    def count(self, types: Optional[Iterable[str]] = None, status: Optional[str] = None) -> int:
+        types = None if types is None else set(types)
+        return sum(count for (txn_type, txn_status), (_, count) in self.groups.items()
+                   if (types is None or txn_type in types) and (status is None or txn_status == status))
+
+    @property
+    def spending(self) -> float:
+        return self.amount(SPENDING_TYPES)
+
+    @property
+    def deposits(self) -> float:
+        return self.amount(DEPOSIT_TYPES)
+
+    @property
+    def total_amount(self) -> float:
+        return self.amount()
+
+    @property
+    def transaction_count(self) -> int:
+        return self.count()
+
+    @property
+    def amount_by_type(self) -> Dict[str, float]:
+        totals = {}
+        for (txn_type, _), (total, _) in self.groups.items():
+            totals[txn_type] = totals.get(txn_type, 0.0) + total
+        return totals
+
+    @property
+    def count_by_type(self) -> Dict[str, int]:
+        counts = {}
+        for (txn_type, _), (_, count) in self.groups.items():
+            counts[txn_type] = counts.get(txn_type, 0) + count
+        return counts
+
+    @property
+    def count_by_status(self) -> Dict[str, int]:
+        counts = {}
+        for (_, status), (_, count) in self.groups.items():
+            counts[status] = counts.get(status, 0) + count
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'spending': self.spending,
+            'deposits': self.deposits,
+            'transaction_count': self.transaction_count,
+            'amount_by_type': self.amount_by_type,
+            'count_by_type': self.count_by_type,
+            'count_by_status': self.count_by_status,
+        }
+
+
+def health_score(total_balance: float, monthly_spending: float) -> float:
+    """0-100 financial health score from balance and this month's spending"""
+    return min(100, max(0, 50 + (total_balance / 1000) - (monthly_spending / 100)))
+
+
+# ----- time series -----
+
+def period_keys(granularity: str, count: int, now: Optional[datetime] = None) -> List[str]:
+    """The last `count` period keys, oldest first, ending with the current one.
+
+    Months are YYYY-MM; days and weeks are YYYY-MM-DD, a week being keyed
+    by its Monday.
+    """
+    now = now or datetime.utcnow()
+    if granularity == 'month':
+        return recent_months(count, now)
+    if granularity == 'week':
+        monday = now - timedelta(days=now.weekday())
+        return [(monday - timedelta(weeks=back)).strftime('%Y-%m-%d') for back in range(count - 1, -1, -1)]
+    return [(now - timedelta(days=back)).strftime('%Y-%m-%d') for back in range(count - 1, -1, -1)]
+
+
+def _period_expr(column, granularity: str):
+    """SQL expression giving the day or week key of a timestamp column"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        if granularity == 'week':
+            return func.to_char(func.date_trunc('week', column), 'YYYY-MM-DD')
+        return func.to_char(column, 'YYYY-MM-DD')
+    if granularity == 'week':
+        return func.date(column, 'weekday 0', '-6 days')
+    return func.strftime('%Y-%m-%d', column)
+
+
+def spending_series(user_id: int, granularity: str = 'month', periods: int = 12,
+                    types: Iterable[str] = SPENDING_TYPES,
+                    now: Optional[datetime] = None) -> 'OrderedDict[str, Dict[str, float]]':
+    """Period key -> {transaction_type: total}, oldest first, empty periods included.
+
+    One grouped query per call: months come from the rollup table, days
+    and weeks from the transactions table over the (user_id, created_at) index.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity must be one of {", ".join(GRANULARITIES)}')
+    keys = period_keys(granularity, periods, now)
+    types = list(types)
+    if granularity == 'month':
+        query = db.session.query(
+            MonthlyRollup.month, MonthlyRollup.transaction_type, func.sum(MonthlyRollup.total_amount)
+        ).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month.in_(keys),
+            MonthlyRollup.transaction_type.in_(types)
+        ).group_by(MonthlyRollup.month, MonthlyRollup.transaction_type)
+    else:
+        period = _period_expr(Transaction.created_at, granularity)
+        query = db.session.query(
+            period, Transaction.transaction_type, func.sum(Transaction.amount)
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.created_at >= datetime.strptime(keys[0], '%Y-%m-%d'),
+            Transaction.transaction_type.in_(types)
+        ).group_by(period, Transaction.transaction_type)
+
+    series = OrderedDict((key, {}) for key in keys)
+    for key, txn_type, total in query.all():
+        if key in series:
+            series[key][txn_type] = total or 0.0
+    return series
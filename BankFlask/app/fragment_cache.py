@@ -0,0 +1,137 @@
+"""
+Fragment Cache - {% cache key, ttl %} blocks for per-user template widgets
+A block's rendered HTML is reused until its TTL runs out or the user's
+data version changes (see app/summary_cache.py). Entries live in an LRU
+bounded by their total size in bytes.
+
+    {% cache 'recent-transactions', 120 %}
+        ... widget markup ...
+    {% endcache %}
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from flask import current_app, g, has_request_context, request, session
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from app.metrics import register_gauge
+from app.summary_cache import summary_cache
+
+
+class FragmentCache:
+    """LRU of rendered fragments bounded by `max_bytes`"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, default_ttl: float = 60.0):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.size = 0
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_render(self, key: Hashable, ttl: Optional[float], render: Callable[[], str]) -> str:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        html = render()
+        size = sys.getsizeof(html)
+        if not ttl or size > self.max_bytes:
+            return html
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            self._entries[key] = (now + ttl, html, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+        return html
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+class FragmentCacheExtension(Extension):
+    """Adds {% cache key[, ttl] %} ... {% endcache %} to the environment"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        position = nodes.Const(f'{parser.name or "<string>"}:{lineno}')
+        key = parser.parse_expression()
+        ttl = parser.parse_expression() if parser.stream.skip_if('comma') else nodes.Const(None)
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [position, key, ttl]), [], [], body).set_lineno(lineno)
+
+    def _render(self, position: str, key, ttl, caller):
+        cache = current_app.extensions.get('fragment_cache') if has_request_context() else None
+        if cache is None:
+            return caller()
+        if current_user and current_user.is_authenticated:
+            user_id = current_user.id
+            snapshot = g.get('fragment_cache_version')
+            version = snapshot[1] if snapshot and snapshot[0] == user_id else summary_cache().version(user_id)
+        else:
+            user_id = version = None
+        return cache.get_or_render((user_id, version, position, key), ttl, caller)
+
+
+register_gauge('bank_fragment_cache_bytes', 'Approximate size of the rendered fragments held in memory.',
+               lambda: current_app.extensions['fragment_cache'].stats()['bytes'])
+register_gauge('bank_fragment_cache_hit_ratio', 'Fragment cache hits over lookups since start.',
+               lambda: current_app.extensions['fragment_cache'].stats()['hit_rate'])
+
+
+def init_app(app) -> FragmentCache:
+    cache = FragmentCache(
+        max_bytes=app.config.get('FRAGMENT_CACHE_MAX_BYTES', 16 * 1024 * 1024),
+        default_ttl=app.config.get('FRAGMENT_CACHE_TTL', 60.0)
+    )
+    app.extensions['fragment_cache'] = cache
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    @app.before_request
+    def _snapshot_data_version():
+        # Taken before the view loads any rows: a commit racing this request
+        # can then only leave fresh HTML under an old key, never stale HTML
+        # under the new one. Static files skip it: reading the session would
+        # add Vary: Cookie and keep shared caches from storing them.
+        if request.endpoint == 'static':
+            return
+        user_id = session.get('_user_id')
+        if user_id is not None and str(user_id).isdigit():
+            g.fragment_cache_version = (int(user_id), summary_cache().version(int(user_id)))
+
+    return cache
@@ -0,0 +1,60 @@
+"""
+Time-Ordered IDs - ULID generator for public identifiers
+A ULID is a 48-bit millisecond timestamp followed by 80 random bits,
+written as 26 Crockford base32 characters, so IDs sort by creation time
+and new rows append to the end of their unique index.
+"""
+
+import base64
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+ULID_LENGTH = 26
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+# RFC 4648 base32 -> Crockford base32 (no I, L, O, U), same bit layout
+_CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_TO_CROCKFORD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', _CROCKFORD)
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value: int) -> str:
+    # 130 bits of base32 cover the 128-bit value; pad to 20 bytes (32 chars)
+    # and keep the last 26, whose two leading bits are always zero.
+    return base64.b32encode(value.to_bytes(20, 'big')).decode()[-ULID_LENGTH:].translate(_TO_CROCKFORD)
+
+
+def new_id() -> str:
+    """A new ULID, strictly increasing within this process.
+
+    IDs created in the same millisecond increment the random part instead
+    of drawing a fresh one, so ordering and uniqueness hold even under
+    bursts; across processes the 80 random bits make collisions negligible.
+    """
+    global _last_ms, _last_random
+    now_ms = time.time_ns() // 1_000_000
+    with _lock:
+        if now_ms > _last_ms:
+            _last_ms, _last_random = now_ms, int.from_bytes(os.urandom(10), 'big')
+        elif _last_random < _RANDOM_MAX:
+            _last_random += 1
+        else:
+            _last_ms, _last_random = _last_ms + 1, 0
+        return _encode((_last_ms << _RANDOM_BITS) | _last_random)
+
+
+def id_timestamp(ulid: str) -> datetime:
+    """UTC creation time encoded in a ULID (naive, like the models' timestamps)"""
+    if len(ulid) != ULID_LENGTH:
+        raise ValueError(f'Not a ULID: {ulid!r}')
+    value = 0
+    for char in ulid.upper():
+        value = value * 32 + _CROCKFORD.index(char)
+    millis = value >> _RANDOM_BITS
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,361 @@
+"""
+Bulk Import - Loads historical transactions from CSV or OFX statements
+Files are parsed as a stream and written in chunks: one multi-row INSERT
+for transactions, one for postings, then one balance and rollup update per
+affected account, instead of one ORM object per row. A chunk that would
+leave any account below zero is rolled back and reported, not written.
+"""
+
+import csv
+import math
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import insert, select, update, bindparam, func
+
+from app import db, rollups
+from app.ids import new_id
+from app.ledger import InsufficientFundsError
+from app.models import Account, Transaction, Posting
+from app.summary_cache import mark_changed
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+TRANSACTION_TYPES = ('DEPOSIT', 'WITHDRAWAL', 'TRANSFER', 'PAYMENT')
+
+OFX_TYPE_MAP = {
+    'CREDIT': 'DEPOSIT', 'DEP': 'DEPOSIT', 'DIRECTDEP': 'DEPOSIT', 'INT': 'DEPOSIT', 'DIV': 'DEPOSIT',
+    'DEBIT': 'WITHDRAWAL', 'ATM': 'WITHDRAWAL', 'POS': 'WITHDRAWAL', 'CASH': 'WITHDRAWAL',
+    'CHECK': 'WITHDRAWAL', 'FEE': 'WITHDRAWAL', 'SRVCHG': 'WITHDRAWAL',
+    'PAYMENT': 'PAYMENT', 'DIRECTDEBIT': 'PAYMENT', 'REPEATPMT': 'PAYMENT',
+    'XFER': 'TRANSFER',
+}
+# How SQLAlchemy's SQLite dialect stores DateTime columns
+SQLITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+_OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<\r\n]*)')
+
+
+class ImportResult:
+    """Running totals for one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'skipped': self.skipped,
+            'errors': [{'line': line, 'error': message} for line, message in self.errors],
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second),
+        }
+
+
+# ===== PARSERS =====
+
+def parse_csv(stream: TextIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (line_number, row) from a CSV with a header row.
+
+    Columns: account_number, date, amount (negative = money out) and the
+    optional type, description, status and transaction_id.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _parse_ofx_date(value: str) -> str:
+    """OFX YYYYMMDD[HHMMSS[.XXX]][[tz]] -> ISO timestamp (timezone dropped)"""
+    digits = value.split('[')[0].split('.')[0]
+    return datetime.strptime(digits[:14].ljust(14, '0'), '%Y%m%d%H%M%S').isoformat()
+
+
+def parse_ofx(stream: TextIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (line_number, row) for every STMTTRN in an OFX 1.x (SGML) or 2.x (XML) file.
+
+    Rows use the same keys as parse_csv() so both feed the same importer.
+    """
+    account_number = None
+    current = None
+    for line_number, line in enumerate(stream, 1):
+        for closing, tag, value in _OFX_TAG.findall(line):
+            value = value.strip()
+            if tag == 'STMTTRN':
+                if not closing:
+                    current = {'account_number': account_number, '_line': line_number}
+                elif current is not None:
+                    row, current = current, None
+                    yield row.pop('_line'), row
+            elif closing:
+                continue
+            elif tag == 'ACCTID':
+                account_number = value
+            elif current is not None:
+                if tag == 'DTPOSTED':
+                    try:
+                        current['date'] = _parse_ofx_date(value)
+                    except ValueError:
+                        current['date'] = value
+                elif tag == 'TRNAMT':
+                    current['amount'] = value
+                elif tag == 'FITID':
+                    current['transaction_id'] = value
+                elif tag == 'TRNTYPE':
+                    current['type'] = OFX_TYPE_MAP.get(value.upper(), '')
+                elif tag in ('NAME', 'MEMO') and value:
+                    current['description'] = f"{current['description']} - {value}" if current.get('description') else value
+
+
+# ===== IMPORTER =====
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate(line: int, raw: Dict[str, str], accounts: Dict[str, Tuple[int, int]],
+              result: ImportResult) -> Optional[Dict]:
+    """Turn a parsed row into insert parameters, or record why it was skipped"""
+    account_number = (raw.get('account_number') or '').strip()
+    if account_number not in accounts:
+        result.add_error(line, f'Unknown account {account_number!r}')
+        return None
+    try:
+        amount = float(raw.get('amount') or '')
+        created_at = datetime.fromisoformat((raw.get('date') or '').strip())
+    except ValueError:
+        result.add_error(line, 'Invalid amount or date')
+        return None
+    if not math.isfinite(amount):
+        result.add_error(line, 'Amount must be a finite number')
+        return None
+    if amount == 0:
+        result.add_error(line, 'Amount must not be zero')
+        return None
+
+    txn_type = (raw.get('type') or '').strip().upper() or ('DEPOSIT' if amount > 0 else 'WITHDRAWAL')
+    if txn_type not in TRANSACTION_TYPES:
+        result.add_error(line, f'Unknown transaction type {txn_type!r}')
+        return None
+
+    account_id, user_id = accounts[account_number]
+    params = {
+        'user_id': user_id,
+        'amount': abs(amount),
+        'transaction_type': txn_type,
+        'status': (raw.get('status') or '').strip().upper() or 'COMPLETED',
+        'description': (raw.get('description') or '').strip() or 'Imported transaction',
+        'from_account': account_number if amount < 0 else None,
+        'to_account': account_number if amount > 0 else None,
+        'created_at': created_at,
+        '_created_at_sql': created_at.strftime(SQLITE_DATETIME_FORMAT),
+        '_account_id': account_id,
+        '_signed': amount,
+    }
+    if raw.get('transaction_id'):
+        params['transaction_id'] = raw['transaction_id'].strip()[:50]
+    return params
+
+
+def _write_chunk(rows: List[Dict]) -> None:
+    """Insert one validated chunk and apply its balance and rollup deltas.
+
+    Raises InsufficientFundsError, with nothing written, if the chunk would
+    take an account below zero.
+    """
+    # Rollups and balances first: on SQLite the first write takes the
+    # database write lock, which makes the id block allocated below safe.
+    buckets = {}
+    for r in rows:
+        key = (r['user_id'], r['_created_at_sql'][:7], r['transaction_type'], r['status'])
+        bucket = buckets.setdefault(key, [r['created_at'], 0.0, 0])
+        bucket[1] += r['amount']
+        bucket[2] += 1
+    for (user_id, _, txn_type, status), (when, total, count) in buckets.items():
+        rollups.record(user_id, when, txn_type, status, total, count)
+    mark_changed(db.session, *{r['user_id'] for r in rows})
+
+    # Only completed movements change balances
+    deltas = defaultdict(float)
+    for r in rows:
+        if r['status'] == 'COMPLETED':
+            deltas[r['_account_id']] += r['_signed']
+    if deltas:
+        accounts = Account.__table__
+        db.session.execute(
+            update(accounts)
+            .where(accounts.c.id == bindparam('account_pk'))
+            .values(balance=accounts.c.balance + bindparam('delta')),
+            [{'account_pk': account_id, 'delta': delta} for account_id, delta in deltas.items()]
+        )
+        debited = [account_id for account_id, delta in deltas.items() if delta < 0]
+        overdrawn = db.session.execute(
+            select(accounts.c.account_number)
+            .where(accounts.c.id.in_(debited), accounts.c.balance < 0)
+        ).scalars().all() if debited else []
+        if overdrawn:
+            raise InsufficientFundsError(f"Chunk would overdraw account {', '.join(overdrawn)}")
+
+    if db.session.get_bind().dialect.name == 'sqlite':
+        _insert_sqlite(rows)
+    else:
+        _insert_returning(rows)
+
+
+def _insert_sqlite(rows: List[Dict]) -> None:
+    """Insert transactions and postings with two raw DBAPI executemany calls.
+
+    Ids are allocated as a block after MAX(id); the caller already holds
+    SQLite's write lock, so no other writer can claim them meanwhile.
+    """
+    transactions = Transaction.__table__
+    next_id = db.session.execute(select(func.coalesce(func.max(transactions.c.id), 0))).scalar() + 1
+
+    txn_params, posting_params = [], []
+    for txn_id, r in enumerate(rows, next_id):
+        created_at = r['_created_at_sql']
+        txn_params.append((
+            txn_id, r.get('transaction_id') or new_id(), r['user_id'], r['amount'],
+            r['transaction_type'], r['status'], r['description'],
+            r['from_account'], r['to_account'], created_at
+        ))
+        posting_params.append((txn_id, r['_account_id'], r['_signed'], created_at))
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.executemany(
+            f'INSERT INTO {transactions.name} (id, transaction_id, user_id, amount, transaction_type, '
+            'status, description, from_account, to_account, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            txn_params
+        )
+        cursor.executemany(
+            f'INSERT INTO {Posting.__tablename__} (transaction_id, account_id, amount, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            posting_params
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_returning(rows: List[Dict]) -> None:
+    """Portable path: batched INSERT ... RETURNING id, then the postings"""
+    # Rows that carry their own transaction_id go in a separate batch so
+    # every row in a batch has the same keys (required for executemany).
+    transactions = Transaction.__table__
+    postings = []
+    for batch in ([r for r in rows if 'transaction_id' in r],
+                  [r for r in rows if 'transaction_id' not in r]):
+        if not batch:
+            continue
+        values = [{k: v for k, v in r.items() if not k.startswith('_')} for r in batch]
+        ids = db.session.execute(
+            insert(transactions).returning(transactions.c.id, sort_by_parameter_order=True),
+            values
+        ).scalars().all()
+        postings.extend({
+            'transaction_id': txn_id,
+            'account_id': r['_account_id'],
+            'amount': r['_signed'],
+            'created_at': r['created_at'],
+        } for txn_id, r in zip(ids, batch))
+    db.session.execute(insert(Posting.__table__), postings)
+
+
+def import_rows(rows: Iterable[Tuple[int, Dict[str, str]]], owner_id: Optional[int] = None,
+                chunk_size: int = CHUNK_SIZE,
+                progress: Optional[Callable[[ImportResult], None]] = None) -> ImportResult:
+    """Validate and insert parsed rows chunk by chunk, committing after each chunk.
+
+    With owner_id only that user's accounts may be imported into. Rows whose
+    transaction_id already exists are skipped, so a file can be re-imported.
+    Chunks that would overdraw an account are skipped whole, one error per row.
+    """
+    result = ImportResult()
+    known_accounts: Dict[str, Tuple[int, int]] = {}
+
+    for chunk in _chunks(rows, chunk_size):
+        result.rows += len(chunk)
+
+        # Resolve the chunk's account numbers in one query
+        wanted = {(raw.get('account_number') or '').strip() for _, raw in chunk} - set(known_accounts)
+        if wanted:
+            query = select(Account.account_number, Account.id, Account.user_id).where(
+                Account.account_number.in_(wanted))
+            if owner_id is not None:
+                query = query.where(Account.user_id == owner_id)
+            for number, account_id, user_id in db.session.execute(query):
+                known_accounts[number] = (account_id, user_id)
+
+        valid = [(line, params) for line, params in
+                 ((line, _validate(line, raw, known_accounts, result)) for line, raw in chunk)
+                 if params is not None]
+
+        # Skip ids already in the table or repeated within the chunk
+        supplied = [params['transaction_id'] for _, params in valid if 'transaction_id' in params]
+        seen = set()
+        if supplied:
+            seen = set(db.session.execute(
+                select(Transaction.transaction_id).where(Transaction.transaction_id.in_(supplied))
+            ).scalars())
+        to_insert, lines = [], []
+        for line, params in valid:
+            txn_id = params.get('transaction_id')
+            if txn_id is not None:
+                if txn_id in seen:
+                    result.add_error(line, f'Duplicate transaction_id {txn_id!r}')
+                    continue
+                seen.add(txn_id)
+            to_insert.append(params)
+            lines.append(line)
+
+        if to_insert:
+            try:
+                _write_chunk(to_insert)
+                db.session.commit()
+            except InsufficientFundsError as e:
+                db.session.rollback()
+                for line in lines:
+                    result.add_error(line, str(e))
+            except Exception:
+                db.session.rollback()
+                raise
+            else:
+                result.inserted += len(to_insert)
+
+        if progress is not None:
+            progress(result)
+
+    return result
+
+
+def import_file(stream: TextIO, fmt: str, **kwargs) -> ImportResult:
+    """Parse a text stream as 'csv' or 'ofx' and import it"""
+    parser = parse_ofx if fmt == 'ofx' else parse_csv
+    return import_rows(parser(stream), **kwargs)
@@ -0,0 +1,170 @@
+"""
+Ledger Service - Atomic balance movements for every money-moving route
+Debits are conditional set-based UPDATEs, so two concurrent requests can
+neither overdraw an account nor overwrite each other's balance change.
+"""
+
+import math
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update, insert, select, and_, exists
+
+from app import db, rollups
+from app.events import balance_event, listening, queue_event
+from app.summary_cache import mark_changed
+from app.models import Account, Transaction, Posting
+
+
+class LedgerError(Exception):
+    """Raised when a ledger operation is rejected"""
+
+
+class InsufficientFundsError(LedgerError):
+    """Raised when a debit would take an account below zero"""
+
+
+class LedgerService:
+    """Moves money between accounts in one short database transaction"""
+
+    @staticmethod
+    def _debit(account_id: int, amount: float, now: datetime) -> None:
+        """Subtract amount only if the account can cover it"""
+        result = db.session.execute(
+            update(Account)
+            .where(Account.id == account_id, Account.balance >= amount)
+            .values(balance=Account.balance - amount, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise InsufficientFundsError('Insufficient balance')
+
+    @staticmethod
+    def _credit(account_id: int, amount: float, now: datetime) -> None:
+        """Add amount to the account balance"""
+        result = db.session.execute(
+            update(Account)
+            .where(Account.id == account_id)
+            .values(balance=Account.balance + amount, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise LedgerError('Account not found')
+
+    @staticmethod
+    def post(user_id: int, amount: float, transaction_type: str, description: str,
+             debit: Optional[Account] = None, credit: Optional[Account] = None) -> Transaction:
+        """Apply a debit and/or credit plus its Transaction row, then commit.
+
+        Any pending changes already in the session (e.g. a freshly flushed
+        Account) are committed together with the movement.
+        """
+        if amount is None or not math.isfinite(amount) or amount <= 0:
+            raise LedgerError('Amount must be a finite number greater than 0')
+        if debit is None and credit is None:
+            raise LedgerError('A movement needs at least one account')
+
+        now = datetime.utcnow()
+        try:
+            # Debit first: on SQLite the UPDATE takes the write lock up front
+            if debit is not None:
+                LedgerService._debit(debit.id, amount, now)
+            if credit is not None:
+                LedgerService._credit(credit.id, amount, now)
+
+            transaction = Transaction(
+                user_id=user_id,
+                amount=amount,
+                transaction_type=transaction_type,
+                status='COMPLETED',
+                description=description,
+                from_account=debit.account_number if debit is not None else None,
+                to_account=credit.account_number if credit is not None else None,
+                created_at=now
+            )
+            if debit is not None:
+                transaction.postings.append(Posting(account_id=debit.id, amount=-amount, created_at=now))
+            if credit is not None:
+                transaction.postings.append(Posting(account_id=credit.id, amount=amount, created_at=now))
+            db.session.add(transaction)
+            rollups.record(user_id, now, transaction_type, 'COMPLETED', amount)
+            # The balance UPDATEs bypass the ORM, and a credit may land in another user's account
+            mark_changed(db.session, user_id,
+                         debit.user_id if debit is not None else None,
+                         credit.user_id if credit is not None else None)
+            LedgerService._queue_balance_events([acc for acc in (debit, credit) if acc is not None])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return transaction
+
+    @staticmethod
+    def _queue_balance_events(accounts) -> None:
+        """Queue the new balances for owners with an open event stream.
+
+        Read inside the movement's own transaction, so the values are
+        exactly what the commit makes visible.
+        """
+        watched = {acc.id: acc for acc in accounts if listening(acc.user_id)}
+        if not watched:
+            return
+        balances = db.session.execute(
+            select(Account.id, Account.balance).where(Account.id.in_(watched))
+        ).all()
+        for account_id, balance in balances:
+            account = watched[account_id]
+            queue_event(db.session, account.user_id, 'balance',
+                        balance_event(account_id, account.account_number, balance))
+
+    @staticmethod
+    def deposit(user_id: int, account: Account, amount: float, description: str) -> Transaction:
+        """Credit an account"""
+        return LedgerService.post(user_id, amount, 'DEPOSIT', description, credit=account)
+
+    @staticmethod
+    def withdraw(user_id: int, account: Account, amount: float, description: str) -> Transaction:
+        """Debit an account if it has sufficient funds"""
+        return LedgerService.post(user_id, amount, 'WITHDRAWAL', description, debit=account)
+
+    @staticmethod
+    def transfer(user_id: int, from_account: Account, to_account: Account,
+                 amount: float, description: str) -> Transaction:
+        """Move funds from one account to another"""
+        if from_account.id == to_account.id:
+            raise LedgerError('Cannot transfer to the same account')
+        return LedgerService.post(user_id, amount, 'TRANSFER', description,
+                                  debit=from_account, credit=to_account)
+
+    @staticmethod
+    def backfill_postings() -> int:
+        """Create missing postings for transactions recorded before the postings table.
+
+        Legs are matched on the free-text from_account/to_account columns, so
+        only movements that name a known account number get a posting.
+        Safe to run repeatedly. Returns the number of postings inserted.
+        """
+        inserted = 0
+        legs = (
+            (Transaction.from_account, -Transaction.amount),
+            (Transaction.to_account, Transaction.amount),
+        )
+        for account_column, signed_amount in legs:
+            already_posted = exists().where(and_(
+                Posting.transaction_id == Transaction.id,
+                Posting.account_id == Account.id
+            ))
+            rows = (
+                select(Transaction.id, Account.id, signed_amount, Transaction.created_at)
+                .join(Account, Account.account_number == account_column)
+                .where(~already_posted)
+            )
+            result = db.session.execute(
+                insert(Posting).from_select(
+                    ['transaction_id', 'account_id', 'amount', 'created_at'], rows
+                )
+            )
+            inserted += result.rowcount
+        db.session.commit()
+        return inserted
@@ -0,0 +1,222 @@
+"""
+Metrics - Prometheus text exposition of per-endpoint request statistics
+Each worker thread counts into its own shard, so the request path takes
+no lock; /metrics sums the shards (and, with METRICS_DIR set, the dumps
+of sibling worker processes) only when scraped.
+"""
+
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+from flask import Response, current_app, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DUMP_INTERVAL = 5.0
+
+_local = threading.local()
+_shards: List[Tuple[threading.Thread, Dict[tuple, float]]] = []
+_retired: Dict[tuple, float] = defaultdict(float)
+_shards_lock = threading.Lock()
+_gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+
+def _shard() -> Dict[tuple, float]:
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = defaultdict(float)
+        with _shards_lock:
+            _retire_dead_threads()
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def _retire_dead_threads() -> None:
+    # Servers that start a thread per request would otherwise grow the
+    # shard list forever; a finished thread's counts move to _retired.
+    live = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            live.append((thread, shard))
+        else:
+            for key, value in shard.items():
+                _retired[key] += value
+    _shards[:] = live
+
+
+def observe_request(endpoint: str, method: str, status: int, duration: float,
+                    db_seconds: float = 0.0, db_queries: int = 0) -> None:
+    """Record one finished request in this thread's shard"""
+    shard = _shard()
+    shard[('requests', endpoint, method, str(status))] += 1
+    if status >= 500:
+        shard[('errors', endpoint)] += 1
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if duration <= bound:
+            shard[('latency_bucket', endpoint, index)] += 1
+            break
+    shard[('latency_sum', endpoint)] += duration
+    shard[('latency_count', endpoint)] += 1
+    shard[('db_seconds', endpoint)] += db_seconds
+    shard[('db_queries', endpoint)] += db_queries
+
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]) -> None:
+    """Expose read() as a gauge, evaluated at scrape time in this process"""
+    _gauges[name] = (help_text, read)
+
+
+def snapshot() -> Dict[tuple, float]:
+    """Sum of every thread's shard in this process"""
+    with _shards_lock:
+        _retire_dead_threads()
+        shards = [shard for _, shard in _shards] + [_retired]
+        totals = defaultdict(float)
+    for shard in shards:
+        for key, value in list(shard.items()):
+            totals[key] += value
+    return totals
+
+
+# ----- multi-process aggregation -----
+
+def dump(directory: str) -> None:
+    """Write this process's totals to <directory>/<pid>.json (atomically)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    data = [[list(key), value] for key, value in snapshot().items() if key[0] != 'in_flight']
+    with open(path + '.tmp', 'w') as handle:
+        json.dump(data, handle)
+    os.replace(path + '.tmp', path)
+
+
+def aggregate(directory: str) -> Dict[tuple, float]:
+    """Totals across every process that has dumped into `directory`.
+
+    Counters are cumulative, so files left by exited workers keep counting
+    towards the totals, as with Prometheus' own multiprocess mode.
+    """
+    dump(directory)
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path) as handle:
+                entries = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        for key, value in entries:
+            totals[tuple(key)] += value
+    return totals
+
+
+# ----- exposition -----
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render(totals: Dict[tuple, float]) -> str:
+    """Prometheus text format (version 0.0.4) for the given totals"""
+    by_kind = defaultdict(list)
+    for key, value in sorted(totals.items(), key=lambda item: tuple(map(str, item[0]))):
+        by_kind[key[0]].append((key[1:], value))
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    family('http_requests_total', 'counter', 'Requests handled, by endpoint, method and status.')
+    for (endpoint, method, status), value in by_kind['requests']:
+        lines.append(f'http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {value:g}')
+
+    family('http_request_errors_total', 'counter', 'Requests that ended in a 5xx response.')
+    for (endpoint,), value in by_kind['errors']:
+        lines.append(f'http_request_errors_total{_labels(endpoint=endpoint)} {value:g}')
+
+    family('http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+    buckets = defaultdict(dict)
+    for (endpoint, index), value in by_kind['latency_bucket']:
+        buckets[endpoint][int(index)] = value
+    sums = {endpoint: value for (endpoint,), value in by_kind['latency_sum']}
+    for (endpoint,), count in by_kind['latency_count']:
+        cumulative = 0.0
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            cumulative += buckets[endpoint].get(index, 0.0)
+            lines.append(f'http_request_duration_seconds_bucket{_labels(endpoint=endpoint, le=bound)} {cumulative:g}')
+        lines.append(f'http_request_duration_seconds_bucket{_labels(endpoint=endpoint, le="+Inf")} {count:g}')
+        lines.append(f'http_request_duration_seconds_sum{_labels(endpoint=endpoint)} {sums.get(endpoint, 0.0):.6f}')
+        lines.append(f'http_request_duration_seconds_count{_labels(endpoint=endpoint)} {count:g}')
+
+    family('http_request_db_seconds_total', 'counter', 'Time spent executing SQL, by endpoint.')
+    for (endpoint,), value in by_kind['db_seconds']:
+        lines.append(f'http_request_db_seconds_total{_labels(endpoint=endpoint)} {value:.6f}')
+
+    family('http_request_db_queries_total', 'counter', 'SQL statements executed, by endpoint.')
+    for (endpoint,), value in by_kind['db_queries']:
+        lines.append(f'http_request_db_queries_total{_labels(endpoint=endpoint)} {value:g}')
+
+    for name, (help_text, read) in sorted(_gauges.items()):
+        try:
+            value = float(read())
+        except Exception:
+            continue
+        family(name, 'gauge', help_text)
+        lines.append(f'{name}{_labels(pid=os.getpid())} {value:g}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# ----- Flask wiring -----
+
+def _in_flight() -> float:
+    return snapshot().get(('in_flight',), 0.0)
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied, token):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    directory = current_app.config.get('METRICS_DIR')
+    totals = aggregate(directory) if directory else snapshot()
+    totals.pop(('in_flight',), None)
+    return Response(render(totals), mimetype='text/plain; version=0.0.4')
+
+
+def init_app(app) -> None:
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    register_gauge('http_requests_in_flight', 'Requests currently being handled.', _in_flight)
+    register_gauge('bank_profiler_armed_requests', 'Requests still queued for on-demand profiling.',
+                   lambda: sum(app.extensions['request_profiler'].armed().values()))
+    state = {'dumped_at': 0.0}
+
+    @app.before_request
+    def _start_metrics():
+        g.metrics_started = time.perf_counter()
+        _shard()[('in_flight',)] += 1
+
+    @app.after_request
+    def _record_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        _shard()[('in_flight',)] -= 1
+        stats = g.get('query_stats')
+        observe_request(request.endpoint or 'unmatched', request.method, response.status_code,
+                        time.perf_counter() - started,
+                        stats.db_time if stats else 0.0, stats.count if stats else 0)
+        directory = app.config.get('METRICS_DIR')
+        now = time.monotonic()
+        if directory and now - state['dumped_at'] > DUMP_INTERVAL:
+            state['dumped_at'] = now
+            dump(directory)
+        return response
@@ -2,7 +2,7 @@ from app import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-import uuid
+from app.ids import new_id
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -20,10 +20,19 @@ class User(UserMixin, db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships with proper backref configuration
-    accounts = db.relationship('Account', backref='owner', lazy=True, cascade='all, delete-orphan')
-    transactions = db.relationship('Transaction', back_populates='user', lazy=True, cascade='all, delete-orphan')
-    ai_insights = db.relationship('AIInsight', back_populates='user', lazy=True, cascade='all, delete-orphan')
+    # Relationships with proper backref configuration. Loading policy:
+    # accounts are few and on nearly every page, so they come in with the
+    # user (one SELECT ... IN); transactions and insights are unbounded and
+    # must be queried with a limit (see app.request_cache), so touching them
+    # lazily raises instead of silently loading the whole history. Only a
+    # load that would emit SQL raises: deleting a user still cascades, and a
+    # delete path may selectinload() them first.
+    accounts = db.relationship('Account', backref='owner', lazy='selectin', order_by='Account.id',
+                               cascade='all, delete-orphan')
+    transactions = db.relationship('Transaction', back_populates='user', lazy='raise_on_sql',
+                                   cascade='all, delete-orphan')
+    ai_insights = db.relationship('AIInsight', back_populates='user', lazy='raise_on_sql',
+                                  cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password securely"""
@@ -44,8 +53,9 @@ class User(UserMixin, db.Model):
     
     @property
     def recent_transactions(self):
-        """Get last 5 transactions"""
-        return Transaction.query.filter_by(user_id=self.id).order_by(Transaction.created_at.desc()).limit(5).all()
+        """Get last 5 transactions (memoized for the request)"""
+        from app import request_cache
+        return request_cache.recent_transactions(self.id, 5)
 
 class Account(db.Model):
     __tablename__ = 'accounts'
@@ -72,9 +82,12 @@ class Account(db.Model):
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_user_created', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    transaction_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    transaction_id = db.Column(db.String(50), unique=True, default=new_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     amount = db.Column(db.Float, nullable=False)
     transaction_type = db.Column(db.String(50), nullable=False)  # DEPOSIT, WITHDRAWAL, TRANSFER, PAYMENT
@@ -85,6 +98,7 @@ class Transaction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     user = db.relationship('User', back_populates='transactions')
+    postings = db.relationship('Posting', back_populates='transaction', lazy=True, cascade='all, delete-orphan')
     
     @property
     def formatted_amount(self):
@@ -99,6 +113,53 @@ class Transaction(db.Model):
         }
         return badges.get(self.status, 'badge-secondary')
 
+class Posting(db.Model):
+    """One leg of a ledger movement against a single account.
+
+    Debits are negative, credits positive; the postings of a transfer sum to zero.
+    """
+    __tablename__ = 'postings'
+    __table_args__ = (
+        db.Index('ix_postings_account_created', 'account_id', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    amount = db.Column(db.Float, nullable=False)  # signed: -debit, +credit
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    transaction = db.relationship('Transaction', back_populates='postings')
+    account = db.relationship('Account')
+
+class BalanceSnapshot(db.Model):
+    """End-of-day balance of an account, written by the nightly snapshot job"""
+    __tablename__ = 'balance_snapshots'
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'snapshot_date', name='uq_balance_snapshots_account_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    snapshot_date = db.Column(db.Date, nullable=False)  # balance at the end of this (UTC) day
+    balance = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class MonthlyRollup(db.Model):
+    """Per-user monthly totals by transaction type and status, kept in step with the ledger"""
+    __tablename__ = 'monthly_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'month', 'transaction_type', 'status', name='uq_monthly_rollups_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM (UTC)
+    transaction_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
 class AIInsight(db.Model):
     __tablename__ = 'ai_insights'
     
@@ -7,7 +7,7 @@ from app import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-import uuid
+from app.ids import new_id
 import json
 
 class User(UserMixin, db.Model):
@@ -70,7 +70,7 @@ class Resume(db.Model):
     __tablename__ = 'resumes'
     
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    resume_id = db.Column(db.String(50), unique=True, default=new_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     file_path = db.Column(db.String(500), nullable=False)
@@ -125,7 +125,7 @@ class LearningPath(db.Model):
     __tablename__ = 'learning_paths'
     
     id = db.Column(db.Integer, primary_key=True)
-    path_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    path_id = db.Column(db.String(50), unique=True, default=new_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     title = db.Column(db.String(255), nullable=False)
@@ -173,7 +173,7 @@ class JobApplication(db.Model):
     __tablename__ = 'job_applications'
     
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    job_id = db.Column(db.String(50), unique=True, default=new_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     job_title = db.Column(db.String(255), nullable=False)
@@ -197,7 +197,7 @@ class AIInsight(db.Model):
     __tablename__ = 'ai_insights'
     
     id = db.Column(db.Integer, primary_key=True)
-    insight_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    insight_id = db.Column(db.String(50), unique=True, default=new_id)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     insight_type = db.Column(db.String(100))  # SKILL_DEMAND, CAREER_PATH, LEARNING_RECOMMENDATION, INTERVIEW_TIP
@@ -222,7 +222,7 @@ class Mentor(db.Model):
     __tablename__ = 'mentors'
     
     id = db.Column(db.Integer, primary_key=True)
-    mentor_id = db.Column(db.String(50), unique=True, default=lambda: str(uuid.uuid4())[:12])
+    mentor_id = db.Column(db.String(50), unique=True, default=new_id)
     
     first_name = db.Column(db.String(120), nullable=False)
     last_name = db.Column(db.String(120), nullable=False)
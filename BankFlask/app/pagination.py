@@ -0,0 +1,104 @@
+"""
+Keyset Pagination - Cursor-based paging over (created_at, id)
+Every page is an index range scan with LIMIT, so page N costs the same
+as page 1 and no COUNT(*) is issued unless a total is asked for.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+
+def encode_cursor(created_at: datetime, row_id: int, direction: str) -> str:
+    """Opaque, URL-safe token for the position just past (created_at, row_id)"""
+    payload = json.dumps([created_at.isoformat(), row_id, direction], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int, str]:
+    """Inverse of encode_cursor()"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(row_id), direction
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as exc:
+        raise InvalidCursorError('Invalid cursor') from exc
+
+
+class KeysetPage:
+    """One page of newest-first results plus cursors to its neighbours"""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str], prev_cursor: Optional[str],
+                 total: Optional[int] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, created_col, id_col, cursor: Optional[str] = None,
+                    per_page: int = 20, total: Optional[int] = None,
+                    key=None) -> KeysetPage:
+    """Page a query newest-first by (created_col, id_col).
+
+    `cursor` is a token from a previous page's next_cursor/prev_cursor.
+    `key` maps a result row to its (created_at, id) pair when the rows are
+    not the entity owning created_col/id_col. `total` is passed through for
+    callers that can supply a cheap (possibly approximate) row count.
+    """
+    key = key or (lambda row: (getattr(row, created_col.key), getattr(row, id_col.key)))
+    direction = 'next'
+
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        if direction == 'next':
+            query = query.filter(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                created_col > created_at,
+                and_(created_col == created_at, id_col > row_id)
+            ))
+
+    if direction == 'next':
+        rows = query.order_by(created_col.desc(), id_col.desc()).limit(per_page + 1).all()
+    else:
+        rows = query.order_by(created_col.asc(), id_col.asc()).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == 'prev':
+        rows.reverse()
+
+    # Moving forward there is a newer page only if we started from a cursor;
+    # moving back there is always an older page (the one we came from).
+    more_older = has_more if direction == 'next' else True
+    more_newer = bool(cursor) if direction == 'next' else has_more
+
+    next_cursor = prev_cursor = None
+    if rows and more_older:
+        next_cursor = encode_cursor(*key(rows[-1]), 'next')
+    if rows and more_newer:
+        prev_cursor = encode_cursor(*key(rows[0]), 'prev')
+
+    return KeysetPage(rows, next_cursor, prev_cursor, total)
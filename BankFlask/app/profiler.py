@@ -0,0 +1,189 @@
+"""
+Request Profiler - On-demand sampling profiles of single live requests
+A request is profiled when it carries the X-Profile-Token header or when
+an admin has armed the profiler for its endpoint. A background thread
+samples the handling thread's stack and the result is written as a
+collapsed-stack (.folded) file, ready for flamegraph.pl or speedscope.
+"""
+
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import g, request
+
+PROFILE_SUFFIX = '.folded'
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds"""
+
+    def __init__(self, thread_id: int, interval: float, root: str):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    def stop(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        self._stopped.set()
+        self.join()
+
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            path = code.co_filename
+            if path.startswith(self.root):
+                path = path[len(self.root):].lstrip(os.sep)
+            else:
+                path = os.path.basename(path)
+            names.append(f'{code.co_name} ({path}:{code.co_firstlineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores their profiles"""
+
+    def __init__(self, app):
+        self.directory = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.token = app.config.get('PROFILER_TOKEN')
+        self.interval = max(app.config.get('PROFILER_INTERVAL_MS', 5),
+                            app.config.get('PROFILER_MIN_INTERVAL_MS', 1)) / 1000
+        self.max_per_minute = app.config.get('PROFILER_MAX_PER_MINUTE', 10)
+        self.keep = app.config.get('PROFILER_KEEP', 50)
+        self.root = os.path.dirname(app.root_path)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._armed: Dict[Optional[str], int] = {}
+
+    # ----- triggers -----
+
+    def arm(self, endpoint: Optional[str] = None, count: int = 1) -> None:
+        """Profile the next `count` requests to `endpoint` (any endpoint if None)"""
+        with self._lock:
+            self._armed[endpoint] = self._armed.get(endpoint, 0) + count
+
+    def armed(self) -> Dict[Optional[str], int]:
+        with self._lock:
+            return dict(self._armed)
+
+    def _wants(self, endpoint: Optional[str], token: Optional[str]) -> bool:
+        if self.token and token and hmac.compare_digest(token, self.token):
+            return True
+        with self._lock:
+            for key in (endpoint, None):
+                if self._armed.get(key):
+                    self._armed[key] -= 1
+                    if not self._armed[key]:
+                        del self._armed[key]
+                    return True
+        return False
+
+    def _within_rate_cap(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute:
+                return False
+            self._recent.append(now)
+            return True
+
+    # ----- request hooks -----
+
+    def start(self) -> None:
+        if not self._wants(request.endpoint, request.headers.get('X-Profile-Token')):
+            return
+        if not self._within_rate_cap():
+            return
+        sampler = StackSampler(threading.get_ident(), self.interval, self.root)
+        sampler.start()
+        g.profile_sampler = sampler
+        g.profile_name = self._profile_name(request.endpoint or 'unknown')
+
+    def finish(self) -> None:
+        sampler = g.pop('profile_sampler', None)
+        if sampler is None:
+            return
+        sampler.stop()
+        name = g.pop('profile_name')
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), 'w') as handle:
+            handle.write(sampler.folded())
+        self._prune()
+
+    def _profile_name(self, endpoint: str) -> str:
+        stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')
+        return f'{stamp}-{_UNSAFE.sub("_", endpoint)}{PROFILE_SUFFIX}'
+
+    # ----- storage -----
+
+    def list_profiles(self, limit: int = 50) -> List[dict]:
+        """Newest profiles first with their endpoint, time and sample count"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((n for n in os.listdir(self.directory) if n.endswith(PROFILE_SUFFIX)), reverse=True)
+        profiles = []
+        for name in names[:limit]:
+            path = os.path.join(self.directory, name)
+            with open(path) as handle:
+                samples = sum(int(line.rsplit(' ', 1)[1]) for line in handle if line.strip())
+            date, clock, micros, endpoint = name[:-len(PROFILE_SUFFIX)].split('-', 3)
+            profiles.append({
+                'name': name,
+                'endpoint': endpoint,
+                'created_at': datetime.strptime(f'{date}{clock}{micros}', '%Y%m%d%H%M%S%f').isoformat(),
+                'samples': samples,
+                'approx_ms': round(samples * self.interval * 1000),
+                'size': os.path.getsize(path),
+            })
+        return profiles
+
+    def _prune(self) -> None:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(PROFILE_SUFFIX))
+        for name in names[:-self.keep] if self.keep else []:
+            os.remove(os.path.join(self.directory, name))
+
+
+def init_app(app) -> RequestProfiler:
+    profiler = RequestProfiler(app)
+    app.extensions['request_profiler'] = profiler
+
+    @app.before_request
+    def _start_profile():
+        profiler.start()
+
+    @app.after_request
+    def _tag_profile(response):
+        if g.get('profile_name'):
+            response.headers['X-Profile'] = g.profile_name
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        # Teardown runs after a streamed body has been sent, so it is covered too
+        profiler.finish()
+
+    return profiler
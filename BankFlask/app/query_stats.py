@@ -0,0 +1,108 @@
+"""
+Query Stats - Per-request SQL statement counts, DB time and N+1 detection
+Cursor hooks on every engine tally statements into the current request;
+the totals go out in a Server-Timing header and the app log, with a
+warning when a route runs too many queries or repeats one shape.
+Statements over SLOW_QUERY_THRESHOLD_MS also go to the slow query log.
+"""
+
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+from app.slow_queries import SlowQueryLog
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with literals and IN-list lengths normalized away"""
+    shape = _LITERALS.sub('?', statement)
+    shape = _IN_LISTS.sub('(?)', shape)
+    return ' '.join(shape.split())
+
+
+class QueryStats:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """(shape, times) for statements run at least `threshold` times"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (f'db;dur={self.db_time * 1000:.1f};desc="{self.count} queries", '
+                f'app;dur={total_ms:.1f}')
+
+
+def current_stats() -> Optional[QueryStats]:
+    return g.get('query_stats') if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = current_stats()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if has_app_context():
+        slow_log = current_app.extensions.get('slow_query_log')
+        if slow_log is not None and elapsed >= slow_log.threshold:
+            slow_log.observe(conn, statement, parameters, executemany, elapsed,
+                             statement_shape(statement), current_app.logger)
+
+
+def init_app(app) -> None:
+    """Instrument every engine of `app` and report per request"""
+    app.extensions['slow_query_log'] = SlowQueryLog(
+        app.config.get('SLOW_QUERY_THRESHOLD_MS', 100),
+        app.config.get('SLOW_QUERY_MAX_ENTRIES', 200)
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def _start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = current_stats()
+        if stats is None:
+            return response
+        if app.config.get('QUERY_STATS_HEADER', True):
+            response.headers['Server-Timing'] = stats.server_timing()
+
+        endpoint = request.endpoint or request.path
+        app.logger.debug('%s %s: %d queries, %.1f ms in DB',
+                         request.method, endpoint, stats.count, stats.db_time * 1000)
+        max_queries = app.config.get('QUERY_COUNT_WARN_THRESHOLD', 30)
+        if stats.count > max_queries:
+            app.logger.warning('%s %s ran %d queries (threshold %d)',
+                               request.method, endpoint, stats.count, max_queries)
+        for shape, times in stats.repeated(app.config.get('QUERY_REPEAT_WARN_THRESHOLD', 5)):
+            app.logger.warning('Possible N+1 in %s %s: statement ran %d times: %s',
+                               request.method, endpoint, times, shape[:200])
+        return response
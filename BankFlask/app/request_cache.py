@@ -0,0 +1,111 @@
+"""
+Request Cache - Per-user lookups memoized for the life of one request
+Views, templates and model properties that ask for the same accounts or
+recent activity share one query per request. The cache is dropped
+whenever the session commits, so a view never sees its own stale reads.
+Counts that outlive a request go through the summary cache as well.
+"""
+
+from collections.abc import Sequence
+from typing import Callable, List, TypeVar
+
+from flask import g, has_app_context
+from flask_login import current_user
+from sqlalchemy import event
+
+from app.db_routing import RoutingSession
+from app.summary_cache import cached
+from app.models import Account, Transaction, AIInsight
+
+T = TypeVar('T')
+
+
+def memoize(key: tuple, loader: Callable[[], T]) -> T:
+    """Return the cached value for `key`, calling loader() on the first ask"""
+    if not has_app_context():
+        return loader()
+    cache = g.setdefault('_request_cache', {})
+    if key not in cache:
+        cache[key] = loader()
+    return cache[key]
+
+
+class LazyRows(Sequence):
+    """A list that runs its loader on first use.
+
+    Views pass these to templates so that a widget served from the
+    fragment cache never runs the query behind it.
+    """
+
+    def __init__(self, loader: Callable[[], List]):
+        self._loader = loader
+        self._rows = None
+
+    @property
+    def rows(self) -> List:
+        if self._rows is None:
+            self._rows = list(self._loader())
+        return self._rows
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+
+def clear() -> None:
+    if has_app_context():
+        g.pop('_request_cache', None)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _clear_after_commit(session):
+    clear()
+
+
+def user_accounts(user_id: int) -> List:
+    """The user's accounts, oldest first.
+
+    For the logged-in user this is the User.accounts collection, which is
+    eager-loaded with the user, so it costs no extra query.
+    """
+    def load():
+        if current_user and current_user.is_authenticated and current_user.id == user_id:
+            return list(current_user.accounts)
+        return Account.query.filter_by(user_id=user_id).order_by(Account.id).all()
+    return memoize(('accounts', user_id), load)
+
+
+def total_balance(user_id: int) -> float:
+    return sum(account.balance for account in user_accounts(user_id))
+
+
+def recent_transactions(user_id: int, limit: int = 10) -> List:
+    """Newest transactions first; smaller limits reuse a larger cached page"""
+    cache = g.get('_request_cache', {}) if has_app_context() else {}
+    for key, rows in cache.items():
+        if key[:2] == ('recent_transactions', user_id) and key[2] >= limit:
+            return rows[:limit]
+    return memoize(('recent_transactions', user_id, limit), lambda: (
+        Transaction.query.filter_by(user_id=user_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit).all()
+    ))
+
+
+def recent_insights(user_id: int, limit: int = 5) -> List:
+    return memoize(('recent_insights', user_id, limit), lambda: (
+        AIInsight.query.filter_by(user_id=user_id)
+        .order_by(AIInsight.created_at.desc())
+        .limit(limit).all()
+    ))
+
+
+def unread_insight_count(user_id: int) -> int:
+    return memoize(('unread_insights', user_id), lambda: cached(user_id, 'unread_insights', lambda: (
+        AIInsight.query.filter_by(user_id=user_id, is_read=False).count()
+    )))
@@ -0,0 +1,148 @@
+"""
+Monthly Rollups - Per-user spending totals maintained alongside the ledger
+Dashboards read a handful of rollup rows instead of re-aggregating raw
+transactions, so their cost does not grow with a user's history.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, delete
+
+from app import db
+from app.models import Transaction, MonthlyRollup
+
+SPENDING_TYPES = ('WITHDRAWAL', 'PAYMENT')
+DEPOSIT_TYPES = ('DEPOSIT',)
+
+
+def month_key(when: datetime) -> str:
+    """YYYY-MM bucket a timestamp falls into"""
+    return when.strftime('%Y-%m')
+
+
+def recent_months(count: int, today: Optional[datetime] = None) -> List[str]:
+    """The last `count` month keys, oldest first, ending with the current month"""
+    today = today or datetime.utcnow()
+    year, month = today.year, today.month
+    keys = []
+    for _ in range(count):
+        keys.append(f'{year:04d}-{month:02d}')
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return keys[::-1]
+
+
+def _month_expr(column):
+    """SQL expression formatting a timestamp column as YYYY-MM"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    return func.strftime('%Y-%m', column)
+
+
+def _upsert():
+    """Dialect-specific INSERT supporting ON CONFLICT DO UPDATE"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(MonthlyRollup)
+
+
+def record(user_id: int, when: datetime, transaction_type: str, status: str,
+           amount: float, count: int = 1) -> None:
+    """Add `count` transactions totalling `amount` to their rollup row.
+
+    Runs in the caller's database transaction, so the rollup commits (or
+    rolls back) together with the ledger write.
+    """
+    stmt = _upsert().values(
+        user_id=user_id,
+        month=month_key(when),
+        transaction_type=transaction_type,
+        status=status,
+        total_amount=amount,
+        transaction_count=count
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'month', 'transaction_type', 'status'],
+        set_={
+            'total_amount': MonthlyRollup.total_amount + stmt.excluded.total_amount,
+            'transaction_count': MonthlyRollup.transaction_count + stmt.excluded.transaction_count,
+        }
+    )
+    db.session.execute(stmt)
+
+
+def rebuild() -> int:
+    """Recompute every rollup row from the transactions table in one transaction.
+
+    Returns the number of rollup rows written.
+    """
+    month = _month_expr(Transaction.created_at)
+    status = func.coalesce(Transaction.status, 'COMPLETED')
+    rows = (
+        select(Transaction.user_id, month, Transaction.transaction_type, status,
+               func.sum(Transaction.amount), func.count(Transaction.id))
+        .group_by(Transaction.user_id, month, Transaction.transaction_type, status)
+    )
+    try:
+        db.session.execute(delete(MonthlyRollup))
+        result = db.session.execute(
+            insert(MonthlyRollup).from_select(
+                ['user_id', 'month', 'transaction_type', 'status', 'total_amount', 'transaction_count'],
+                rows
+            )
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return result.rowcount
+
+
+def totals_by_type(user_id: int, months: int = 1,
+                   status: Optional[str] = None) -> Dict[str, Tuple[float, int]]:
+    """{transaction_type: (total, count)} over the last `months` calendar months"""
+    query = db.session.query(
+        MonthlyRollup.transaction_type,
+        func.sum(MonthlyRollup.total_amount),
+        func.sum(MonthlyRollup.transaction_count)
+    ).filter(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.month.in_(recent_months(months))
+    )
+    if status is not None:
+        query = query.filter(MonthlyRollup.status == status)
+    rows = query.group_by(MonthlyRollup.transaction_type).all()
+    return {txn_type: (total or 0.0, count or 0) for txn_type, total, count in rows}
+
+
+def sum_types(totals: Dict[str, Tuple[float, int]], types: Iterable[str]) -> float:
+    """Total amount of the given transaction types in a totals_by_type() result"""
+    return sum(totals.get(txn_type, (0.0, 0))[0] for txn_type in types)
+
+
+def total_count(user_id: int) -> int:
+    """Number of transactions a user has made, summed over their rollup rows"""
+    return db.session.query(func.coalesce(func.sum(MonthlyRollup.transaction_count), 0)).filter(
+        MonthlyRollup.user_id == user_id
+    ).scalar()
+
+
+def monthly_series(user_id: int, months: int = 12,
+                   types: Iterable[str] = SPENDING_TYPES) -> 'OrderedDict[str, float]':
+    """Month key -> total of the given types, oldest first, zero-filled"""
+    series = OrderedDict((key, 0.0) for key in recent_months(months))
+    rows = db.session.query(
+        MonthlyRollup.month, func.sum(MonthlyRollup.total_amount)
+    ).filter(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.month.in_(list(series)),
+        MonthlyRollup.transaction_type.in_(list(types))
+    ).group_by(MonthlyRollup.month).all()
+    for month, total in rows:
+        series[month] = total or 0.0
+    return series
@@ -1,33 +1,32 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_required, current_user
-from app import db
-from app.models import Account, Transaction
+from app import db, request_cache
+from app.models import Account, Transaction, Posting
+from app.ledger import LedgerService, InsufficientFundsError
+from app.snapshots import balance_as_of
+from app.timestamps import parse_timestamp
+from app.pagination import keyset_paginate, InvalidCursorError
+from app.account_directory import account_directory
+from app.conditional import etag_by_data_version
 from datetime import datetime, timedelta
-import random
-import string
 
 accounts_bp = Blueprint('accounts', __name__, url_prefix='/accounts')
 
 def generate_account_number():
-    """Generate unique 16-digit account number"""
-    while True:
-        account_num = ''.join(random.choices(string.digits, k=16))
-        if not Account.query.filter_by(account_number=account_num).first():
-            return account_num
+    """Allocate a unique 16-digit account number"""
+    return account_directory().allocate()[0]
 
 @accounts_bp.route('/dashboard')
 @login_required
 def dashboard():
     """Account management dashboard with real data"""
-    user_accounts = Account.query.filter_by(user_id=current_user.id).all()
+    user_accounts = request_cache.user_accounts(current_user.id)
     
     # Calculate totals
     total_balance = sum(acc.balance for acc in user_accounts) if user_accounts else 0
     
     # Get recent transactions
-    recent_transactions = Transaction.query.filter_by(user_id=current_user.id).order_by(
-        Transaction.created_at.desc()
-    ).limit(10).all()
+    recent_transactions = request_cache.LazyRows(lambda: request_cache.recent_transactions(current_user.id, 10))
     
     # Calculate monthly metrics
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -86,31 +85,38 @@ def view_account(account_id):
         flash('Unauthorized access', 'danger')
         return redirect(url_for('accounts.dashboard'))
     
-    # Get transactions for this account
-    transactions = Transaction.query.filter_by(user_id=current_user.id).filter(
-        db.or_(
-            Transaction.from_account == account.account_number,
-            Transaction.to_account == account.account_number
+    # Get a page of this account's postings (index range scan on account_id, created_at).
+    # The total is counted on the first page only and carried along in the page links.
+    cursor = request.args.get('cursor')
+    total = request.args.get('total', type=int) if cursor else None
+    if total is None:
+        total = Posting.query.filter(Posting.account_id == account.id).count()
+    try:
+        postings = keyset_paginate(
+            Posting.query.filter(Posting.account_id == account.id)
+                .join(Posting.transaction)
+                .options(db.contains_eager(Posting.transaction)),
+            Posting.created_at, Posting.id,
+            cursor=cursor, per_page=25, total=total
         )
-    ).order_by(Transaction.created_at.desc()).all()
+    except InvalidCursorError:
+        return redirect(url_for('accounts.view_account', account_id=account.id))
     
-    # Calculate stats
+    # Calculate stats: money that left this account in the last 30 days
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    monthly_spending = db.session.query(db.func.sum(Transaction.amount)).filter(
-        db.or_(
-            Transaction.from_account == account.account_number,
-            Transaction.to_account == account.account_number
-        ),
+    monthly_spending = db.session.query(db.func.sum(-Posting.amount)).join(Posting.transaction).filter(
+        Posting.account_id == account.id,
+        Posting.created_at >= thirty_days_ago,
+        Posting.amount < 0,
         Transaction.transaction_type.in_(['WITHDRAWAL', 'TRANSFER', 'PAYMENT']),
-        Transaction.created_at >= thirty_days_ago,
         Transaction.status == 'COMPLETED'
     ).scalar() or 0
     
     return render_template('accounts/view.html',
                          account=account,
-                         transactions=transactions,
+                         postings=postings,
                          monthly_spending=abs(monthly_spending),
-                         transaction_count=len(transactions))
+                         transaction_count=postings.total)
 
 @accounts_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -139,7 +145,7 @@ def create_account():
                 user_id=current_user.id,
                 account_name=account_name,
                 account_type=account_type,
-                balance=max(initial_deposit, 0),
+                balance=0.0,
                 account_number=generate_account_number(),
                 currency='USD',
                 status='ACTIVE'
@@ -147,19 +153,12 @@ def create_account():
             db.session.add(new_account)
             db.session.flush()
             
-            # Record initial deposit
+            # Record initial deposit (commits the new account with it)
             if initial_deposit > 0:
-                transaction = Transaction(
-                    user_id=current_user.id,
-                    amount=initial_deposit,
-                    transaction_type='DEPOSIT',
-                    status='COMPLETED',
-                    description=f'Initial deposit to {account_name}',
-                    to_account=new_account.account_number
-                )
-                db.session.add(transaction)
-            
-            db.session.commit()
+                LedgerService.deposit(current_user.id, new_account, initial_deposit,
+                                      f'Initial deposit to {account_name}')
+            else:
+                db.session.commit()
             flash(f'✓ Account "{account_name}" created with ${initial_deposit:,.2f}', 'success')
             return redirect(url_for('accounts.dashboard'))
         
@@ -191,7 +190,7 @@ def transfer(account_id):
         amount = request.form.get('amount', 0, type=float)
         description = request.form.get('description', '').strip()
         
-        if not to_account_id or amount <= 0 or amount > from_account.balance:
+        if not to_account_id or amount <= 0:
             flash('Invalid transfer details', 'danger')
             return render_template('accounts/transfer.html', from_account=from_account, to_accounts=to_accounts)
         
@@ -201,28 +200,15 @@ def transfer(account_id):
             return redirect(url_for('accounts.dashboard'))
         
         try:
-            from_account.balance -= amount
-            to_account.balance += amount
-            from_account.updated_at = datetime.utcnow()
-            to_account.updated_at = datetime.utcnow()
-            
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                transaction_type='TRANSFER',
-                status='COMPLETED',
-                description=description or f'Transfer to {to_account.account_name}',
-                from_account=from_account.account_number,
-                to_account=to_account.account_number
-            )
-            db.session.add(transaction)
-            db.session.commit()
+            LedgerService.transfer(current_user.id, from_account, to_account, amount,
+                                   description or f'Transfer to {to_account.account_name}')
             
             flash(f'✓ Transferred ${amount:,.2f}', 'success')
             return redirect(url_for('accounts.view_account', account_id=from_account.id))
         
+        except InsufficientFundsError:
+            flash('Insufficient balance', 'danger')
         except Exception as e:
-            db.session.rollback()
             flash(f'Error: {str(e)}', 'danger')
     
     return render_template('accounts/transfer.html', from_account=from_account, to_accounts=to_accounts)
@@ -245,24 +231,11 @@ def deposit(account_id):
             return render_template('accounts/deposit.html', account=account)
         
         try:
-            account.balance += amount
-            account.updated_at = datetime.utcnow()
-            
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                transaction_type='DEPOSIT',
-                status='COMPLETED',
-                description=description or 'Deposit',
-                to_account=account.account_number
-            )
-            db.session.add(transaction)
-            db.session.commit()
+            LedgerService.deposit(current_user.id, account, amount, description or 'Deposit')
             
             flash(f'✓ Deposited ${amount:,.2f}', 'success')
             return redirect(url_for('accounts.view_account', account_id=account.id))
         except Exception as e:
-            db.session.rollback()
             flash(f'Error: {str(e)}', 'danger')
     
     return render_template('accounts/deposit.html', account=account)
@@ -280,38 +253,37 @@ def withdraw(account_id):
         amount = request.form.get('amount', 0, type=float)
         description = request.form.get('description', '').strip()
         
-        if amount <= 0 or amount > account.balance:
+        if amount <= 0:
             flash('Invalid amount', 'danger')
             return render_template('accounts/withdraw.html', account=account)
         
         try:
-            account.balance -= amount
-            account.updated_at = datetime.utcnow()
-            
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                transaction_type='WITHDRAWAL',
-                status='COMPLETED',
-                description=description or 'Withdrawal',
-                from_account=account.account_number
-            )
-            db.session.add(transaction)
-            db.session.commit()
+            LedgerService.withdraw(current_user.id, account, amount, description or 'Withdrawal')
             
             flash(f'✓ Withdrew ${amount:,.2f}', 'success')
             return redirect(url_for('accounts.view_account', account_id=account.id))
+        except InsufficientFundsError:
+            flash('Insufficient balance', 'danger')
         except Exception as e:
-            db.session.rollback()
             flash(f'Error: {str(e)}', 'danger')
     
     return render_template('accounts/withdraw.html', account=account)
 
 @accounts_bp.route('/api/balance/<int:account_id>')
 @login_required
+@etag_by_data_version
 def api_balance(account_id):
-    """Get account balance"""
+    """Get account balance, optionally as of a past ISO timestamp (?as_of=)"""
     account = Account.query.get_or_404(account_id)
     if account.user_id != current_user.id:
         return jsonify({'success': False}), 403
+    
+    as_of = request.args.get('as_of')
+    if as_of:
+        try:
+            ts = parse_timestamp(as_of)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'as_of must be an ISO timestamp'}), 400
+        return jsonify({'balance': round(balance_as_of(account, ts), 2), 'as_of': ts.isoformat()})
+    
     return jsonify({'balance': round(account.balance, 2)})
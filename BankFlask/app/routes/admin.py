@@ -3,9 +3,16 @@ Admin Dashboard Routes
 Handles platform analytics, KPIs, and administrative functions
 """
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory, abort
 from flask_login import login_required, current_user
 from functools import wraps
+import io
+from app import db
+from app.config import engine_diagnostics
+from app.db_routing import READ_BIND_KEY
+from app.imports import import_file
+from app.profiler import PROFILE_SUFFIX
+from app.summary_cache import summary_cache
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -268,3 +275,138 @@ def export_report():
     }
     
     return jsonify(report), 200
+
+
+@admin_bp.route('/api/db-diagnostics')
+@login_required
+@admin_required
+def db_diagnostics():
+    """Effective database profile, pool and SQLite pragma settings"""
+    
+    info = engine_diagnostics(
+        db.engine,
+        current_app.config.get('PROFILE_NAME'),
+        current_app.config.get('SQLITE_PRAGMAS') or {}
+    )
+    info['engine_options'] = current_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if READ_BIND_KEY in db.engines:
+        info['read_engine'] = engine_diagnostics(
+            db.engines[READ_BIND_KEY],
+            current_app.config.get('PROFILE_NAME'),
+            current_app.config.get('SQLITE_PRAGMAS') or {}
+        )
+    
+    return jsonify(info), 200
+
+
+@admin_bp.route('/api/profiles')
+@login_required
+@admin_required
+def list_profiles():
+    """Recent request profiles, newest first, plus any armed triggers"""
+    profiler = current_app.extensions['request_profiler']
+    limit = request.args.get('limit', 50, type=int)
+    
+    return jsonify({
+        'profiles': profiler.list_profiles(limit),
+        'armed': [{'endpoint': endpoint, 'remaining': count} for endpoint, count in profiler.armed().items()]
+    }), 200
+
+
+@admin_bp.route('/api/profiles', methods=['POST'])
+@login_required
+@admin_required
+def arm_profiler():
+    """Profile the next N requests, optionally only to one endpoint"""
+    data = request.get_json(silent=True) or {}
+    endpoint = data.get('endpoint') or None
+    count = data.get('count', 1)
+    
+    if endpoint and endpoint not in current_app.view_functions:
+        return jsonify({'error': f'Unknown endpoint {endpoint}'}), 400
+    if not isinstance(count, int) or not 1 <= count <= 100:
+        return jsonify({'error': 'count must be between 1 and 100'}), 400
+    
+    current_app.extensions['request_profiler'].arm(endpoint, count)
+    return jsonify({'armed': {'endpoint': endpoint, 'count': count}}), 201
+
+
+@admin_bp.route('/api/profiles/<name>')
+@login_required
+@admin_required
+def download_profile(name):
+    """One profile in collapsed-stack format"""
+    if not name.endswith(PROFILE_SUFFIX):
+        abort(404)
+    
+    return send_from_directory(current_app.extensions['request_profiler'].directory, name,
+                               mimetype='text/plain')
+
+
+@admin_bp.route('/api/slow-queries')
+@login_required
+@admin_required
+def slow_queries():
+    """Slow statements aggregated by shape, worst first, with their query plans"""
+    slow_log = current_app.extensions['slow_query_log']
+    sort = request.args.get('sort', 'total_ms')
+    limit = request.args.get('limit', 50, type=int)
+    
+    return jsonify({
+        'threshold_ms': slow_log.threshold * 1000,
+        'queries': slow_log.worst(sort, limit)
+    }), 200
+
+
+@admin_bp.route('/api/slow-queries', methods=['DELETE'])
+@login_required
+@admin_required
+def reset_slow_queries():
+    """Clear the slow query log"""
+    current_app.extensions['slow_query_log'].reset()
+    return jsonify({'status': 'cleared'}), 200
+
+
+@admin_bp.route('/api/summary-cache')
+@login_required
+@admin_required
+def summary_cache_stats():
+    """Size and hit rate of the per-user summary cache"""
+    return jsonify(summary_cache().stats()), 200
+
+
+@admin_bp.route('/api/summary-cache', methods=['DELETE'])
+@login_required
+@admin_required
+def reset_summary_cache():
+    """Drop every cached summary and reset the counters"""
+    summary_cache().clear()
+    return jsonify({'status': 'cleared'}), 200
+
+
+@admin_bp.route('/api/transactions/import', methods=['POST'])
+@login_required
+@admin_required
+def import_transactions():
+    """Bulk-import a CSV or OFX statement (back office; same rules as `flask ledger import-transactions`)"""
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    fmt = request.form.get('format') or ('ofx' if upload.filename.lower().endswith(('.ofx', '.qfx')) else 'csv')
+    if fmt not in ('csv', 'ofx'):
+        return jsonify({'error': 'format must be csv or ofx'}), 400
+    
+    # Chunks are committed as they are written, so decode the whole upload
+    # first: a bad byte halfway through must not leave half a file imported
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    try:
+        for _ in stream:
+            pass
+    except UnicodeDecodeError:
+        return jsonify({'error': 'File must be UTF-8 text'}), 400
+    stream.seek(0)
+    
+    result = import_file(stream, fmt)
+    
+    return jsonify(result.to_dict()), 200
@@ -1,30 +1,26 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_required, current_user
-from app import db
-from app.models import Account, Transaction
-from datetime import datetime, timedelta
+from app import db, request_cache
+from app.financial_summary import FinancialSummary, health_score
+from app.conditional import etag_by_data_version
+from app.db_routing import read_only
 
 advisor_bp = Blueprint('advisor', __name__, url_prefix='/advisor')
 
 @advisor_bp.route('/')
 @login_required
+@read_only
 def dashboard():
     """AI Financial Advisor dashboard"""
     # Get user financial snapshot
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
-    # Calculate metrics
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    monthly_transactions = Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all()
-    
-    monthly_spending = sum(txn.amount for txn in monthly_transactions if txn.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
+    # Calculate metrics (current month)
+    monthly_spending = FinancialSummary.for_user(current_user.id, 'month').spending
     
     # Financial health score (AI calculated)
-    health_score = min(100, max(0, 50 + (total_balance / 1000) - (monthly_spending / 100)))
+    score = health_score(total_balance, monthly_spending)
     
     insights = [
         {
@@ -50,7 +46,7 @@ def dashboard():
     return render_template('advisor/dashboard.html',
                          total_balance=total_balance,
                          monthly_spending=monthly_spending,
-                         health_score=int(health_score),
+                         health_score=int(score),
                          insights=insights)
 
 @advisor_bp.route('/chat')
@@ -67,14 +63,10 @@ def api_chat():
     message = data.get('message', '').lower()
     
     # Get user data for contextual answers
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    spending = sum(t.amount for t in Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all() if t.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
+    spending = FinancialSummary.for_user(current_user.id, 30).spending
     
     # Banking FAQ database
     faq = {
@@ -155,9 +147,10 @@ def recommendations():
 
 @advisor_bp.route('/financial-health')
 @login_required
+@read_only
 def financial_health():
     """Comprehensive financial health assessment"""
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
     assessment = {
@@ -212,19 +205,17 @@ def risk_profile():
 
 @advisor_bp.route('/api/health-score')
 @login_required
+@read_only
+@etag_by_data_version
 def api_health_score():
     """Get real-time financial health score"""
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    spending = sum(t.amount for t in Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all() if t.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
+    spending = FinancialSummary.for_user(current_user.id, 'month').spending
     
     # Calculate health score
-    score = min(100, max(0, 50 + (total_balance / 1000) - (spending / 100)))
+    score = health_score(total_balance, spending)
     
     return jsonify({
         'score': int(score),
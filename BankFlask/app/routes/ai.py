@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
-from app.models import AIInsight, Transaction
+from app.models import AIInsight
 from app import db
-from datetime import datetime, timedelta
+from app.financial_summary import FinancialSummary
+from app.conditional import etag_by_data_version
+from app.db_routing import read_only
 import os
 
 ai_bp = Blueprint('ai', __name__, url_prefix='/ai')
@@ -11,19 +13,16 @@ def generate_ai_insights(user):
     """Generate AI insights based on user's transactions"""
     insights = []
     
-    # Get recent transactions
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    transactions = Transaction.query.filter(
-        Transaction.user_id == user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all()
+    # Get this month's totals
+    summary = FinancialSummary.for_user(user.id, 'month')
+    transaction_count = summary.transaction_count
     
-    if not transactions:
+    if not transaction_count:
         return insights
     
     # Analyze spending patterns
-    total_spending = sum(t.amount for t in transactions if t.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
-    total_deposits = sum(t.amount for t in transactions if t.transaction_type == 'DEPOSIT')
+    total_spending = summary.spending
+    total_deposits = summary.deposits
     
     # Spending pattern insight
     if total_spending > total_deposits * 0.8:
@@ -52,7 +51,7 @@ def generate_ai_insights(user):
         user_id=user.id,
         insight_type='ACCOUNT_HEALTH',
         title='Account Activity Status',
-        description=f'You have {len(transactions)} transactions in the last 30 days. Your account is active and healthy.',
+        description=f'You have {transaction_count} transactions this month. Your account is active and healthy.',
         confidence=0.95,
         action_items=['Continue monitoring', 'Review statements regularly']
     ))
@@ -61,6 +60,7 @@ def generate_ai_insights(user):
 
 @ai_bp.route('/dashboard')
 @login_required
+@read_only
 def dashboard():
     # Get or generate insights
     insights = AIInsight.query.filter_by(user_id=current_user.id)\
@@ -72,22 +72,14 @@ def dashboard():
         db.session.commit()
         insights = new_insights
     
-    # Get transactions for analysis
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    transactions = Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all()
-    
-    # Calculate statistics
-    spending = sum(t.amount for t in transactions if t.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
-    deposits = sum(t.amount for t in transactions if t.transaction_type == 'DEPOSIT')
+    # Statistics for the last 30 days
+    summary = FinancialSummary.for_user(current_user.id, 30)
     
     return render_template('ai/dashboard.html',
         insights=insights,
-        spending=spending,
-        deposits=deposits,
-        transaction_count=len(transactions)
+        spending=summary.spending,
+        deposits=summary.deposits,
+        transaction_count=summary.transaction_count
     )
 
 @ai_bp.route('/insights')
@@ -100,6 +92,7 @@ def insights():
 
 @ai_bp.route('/api/recommendations')
 @login_required
+@etag_by_data_version
 def api_recommendations():
     # Generate personalized recommendations
     insights = AIInsight.query.filter_by(user_id=current_user.id).limit(5).all()
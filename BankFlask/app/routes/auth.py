@@ -2,8 +2,8 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db, login_manager
 from app.models import User, Account
-import random
-import string
+from app.account_directory import account_directory
+from app.metrics import register_gauge
 import re
 from datetime import datetime, timedelta
 
@@ -13,17 +13,16 @@ auth_bp = Blueprint('auth', __name__)
 login_attempts = {}
 MAX_ATTEMPTS = 5
 LOCKOUT_TIME = 15  # minutes
+register_gauge('bank_login_attempts_tracked', 'Usernames with failed login attempts held in memory.',
+               lambda: len(login_attempts))
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
 def generate_account_number():
-    """Generate unique 16-digit account number"""
-    while True:
-        account_num = ''.join(random.choices(string.digits, k=16))
-        if not User.query.filter_by(account_number=account_num).first() and not Account.query.filter_by(account_number=account_num).first():
-            return account_num
+    """Allocate a unique 16-digit account number"""
+    return account_directory().allocate()[0]
 
 def is_valid_email(email):
     """Validate email format"""
@@ -197,6 +196,9 @@ def register():
             return render_template('auth/register.html')
         
         try:
+            # One user number plus the two default accounts
+            user_number, savings_number, checking_number = account_directory().allocate(3)
+            
             # Create user account
             user = User(
                 username=username,
@@ -204,7 +206,7 @@ def register():
                 first_name=first_name,
                 last_name=last_name,
                 phone=phone,
-                account_number=generate_account_number(),
+                account_number=user_number,
                 email_verified=False
             )
             user.set_password(password)
@@ -218,7 +220,7 @@ def register():
                 account_type='SAVINGS',
                 account_name='My Savings Account',
                 balance=5000.0,
-                account_number=generate_account_number(),
+                account_number=savings_number,
                 currency='USD'
             )
             db.session.add(savings_account)
@@ -229,7 +231,7 @@ def register():
                 account_type='CHECKING',
                 account_name='My Checking Account',
                 balance=2000.0,
-                account_number=generate_account_number(),
+                account_number=checking_number,
                 currency='USD'
             )
             db.session.add(checking_account)
@@ -1,9 +1,8 @@
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
-from app.models import Account, Transaction, AIInsight
-from app import db
-from sqlalchemy import func
-from datetime import datetime, timedelta
+from app import db, request_cache
+from app.financial_summary import FinancialSummary
+from app.conditional import etag_by_data_version
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
@@ -11,31 +10,20 @@ dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 @login_required
 def index():
     # Get user's accounts
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(account.balance for account in accounts)
     
-    # Get recent transactions
-    recent_transactions = Transaction.query.filter_by(user_id=current_user.id)\
-        .order_by(Transaction.created_at.desc()).limit(10).all()
+    # Get recent transactions (loaded only if the template's widget is not cached)
+    recent_transactions = request_cache.LazyRows(lambda: request_cache.recent_transactions(current_user.id, 10))
     
     # Get AI insights
-    insights = AIInsight.query.filter_by(user_id=current_user.id)\
-        .order_by(AIInsight.created_at.desc()).limit(5).all()
+    insights = request_cache.LazyRows(lambda: request_cache.recent_insights(current_user.id, 5))
     
-    # Get transaction statistics
-    today = datetime.utcnow().date()
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    
-    month_transactions = Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all()
-    
-    month_spending = sum(t.amount for t in month_transactions if t.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
-    month_deposits = sum(t.amount for t in month_transactions if t.transaction_type == 'DEPOSIT')
+    # Get transaction statistics (current month)
+    summary = FinancialSummary.for_user(current_user.id, 'month')
     
     # Get unread insights count
-    unread_insights = AIInsight.query.filter_by(user_id=current_user.id, is_read=False).count()
+    unread_insights = request_cache.unread_insight_count(current_user.id)
     
     return render_template('dashboard/index.html',
         accounts=accounts,
@@ -43,15 +31,15 @@ def index():
         recent_transactions=recent_transactions,
         insights=insights,
         unread_insights=unread_insights,
-        month_spending=month_spending,
-        month_deposits=month_deposits,
-        transaction_count=len(recent_transactions)
+        month_spending=summary.spending,
+        month_deposits=summary.deposits,
+        transaction_count=summary.transaction_count
     )
 
 @dashboard_bp.route('/accounts')
 @login_required
 def accounts():
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     return render_template('dashboard/accounts.html', accounts=accounts)
 
 @dashboard_bp.route('/profile')
@@ -61,8 +49,9 @@ def profile():
 
 @dashboard_bp.route('/api/balance')
 @login_required
+@etag_by_data_version
 def api_balance():
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     return jsonify({
         'total_balance': sum(account.balance for account in accounts),
         'accounts': [{'type': a.account_type, 'balance': a.balance} for a in accounts]
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_required, current_user
-from app import db
-from app.models import Transaction, Account
-from datetime import datetime, timedelta
+from app import db, request_cache
+from app.financial_summary import FinancialSummary, GRANULARITIES, MAX_PERIODS, period_keys, spending_series
+from app.summary_cache import cached
+from app.db_routing import read_only
+from datetime import datetime
 from functools import reduce
 import operator
 
@@ -10,26 +12,15 @@ planning_bp = Blueprint('planning', __name__, url_prefix='/planning')
 
 @planning_bp.route('/')
 @login_required
+@read_only
 def dashboard():
     """Financial planning dashboard"""
     # Get user's accounts and balance
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
-    # Get spending by category (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    transactions = Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= thirty_days_ago
-    ).all()
-    
-    # Calculate spending breakdown
-    spending = {}
-    for txn in transactions:
-        category = txn.transaction_type
-        if category not in spending:
-            spending[category] = 0
-        spending[category] += txn.amount
+    # Get spending breakdown by category (current month)
+    spending = FinancialSummary.for_user(current_user.id, 'month').amount_by_type
     
     # Get financial goals
     goals = [
@@ -89,19 +80,16 @@ def goals():
 
 @planning_bp.route('/expense-analysis')
 @login_required
+@read_only
 def expense_analysis():
     """AI-powered expense analysis"""
-    # Get transactions from last 3 months
-    ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-    transactions = Transaction.query.filter(
-        Transaction.user_id == current_user.id,
-        Transaction.created_at >= ninety_days_ago
-    ).all()
+    # Totals for the last 3 months
+    summary = FinancialSummary.for_user(current_user.id, 90)
     
     # Analyze spending patterns
     analysis = {
-        'total_spending': sum(txn.amount for txn in transactions if txn.transaction_type in ['WITHDRAWAL', 'PAYMENT']),
-        'average_monthly': sum(txn.amount for txn in transactions) / 3,
+        'total_spending': summary.spending,
+        'average_monthly': summary.total_amount / 3,
         'top_category': 'Dining Out',
         'spending_trend': 'Increasing',
         'ai_recommendation': 'Consider setting a budget for dining out expenses to optimize savings.',
@@ -117,7 +105,7 @@ def expense_analysis():
 @login_required
 def recommendations():
     """AI-powered financial recommendations"""
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
     recommendations = [
@@ -145,26 +133,35 @@ def recommendations():
 
 @planning_bp.route('/api/spending-chart')
 @login_required
+@read_only
 def api_spending_chart():
-    """Get spending data for charts"""
-    # Get last 12 months data
-    months_data = []
-    days_ago_range = 365
+    """Get spending data for charts.
+
+    ?granularity=day|week|month (default month) and ?periods=N (default 12)
+    select the buckets; each carries its total and a per-type breakdown.
+    """
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        return jsonify({'error': f'granularity must be one of {", ".join(GRANULARITIES)}'}), 400
+    periods = request.args.get('periods', 12, type=int)
+    if not 1 <= periods <= MAX_PERIODS[granularity]:
+        return jsonify({'error': f'periods must be between 1 and {MAX_PERIODS[granularity]}'}), 400
     
-    for i in range(12):
-        date = datetime.utcnow() - timedelta(days=days_ago_range - i*30)
-        month_transactions = Transaction.query.filter(
-            Transaction.user_id == current_user.id,
-            Transaction.created_at.between(
-                date.replace(day=1),
-                (date.replace(day=1) + timedelta(days=31)).replace(day=1) - timedelta(days=1)
-            )
-        ).all()
-        
-        monthly_spending = sum(txn.amount for txn in month_transactions if txn.transaction_type in ['WITHDRAWAL', 'PAYMENT'])
-        months_data.append({
-            'month': date.strftime('%b'),
-            'spending': monthly_spending
-        })
+    # Keyed by the current period too, so the buckets roll over on time
+    key = ('spending_series', granularity, periods, period_keys(granularity, 1)[0])
+    series = cached(current_user.id, key, lambda: spending_series(current_user.id, granularity, periods))
+    
+    label_format = '%Y-%m' if granularity == 'month' else '%Y-%m-%d'
+    chart_data = []
+    for period, by_type in series.items():
+        point = {
+            'period': period,
+            'label': datetime.strptime(period, label_format).strftime('%b' if granularity == 'month' else '%b %d'),
+            'spending': sum(by_type.values()),
+            'by_type': by_type
+        }
+        if granularity == 'month':
+            point['month'] = point['label']
+        chart_data.append(point)
     
-    return jsonify(months_data)
+    return jsonify(chart_data)
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_required, current_user
-from app import db
+from app import db, request_cache
 from app.models import Account
 from datetime import datetime
 
@@ -90,7 +90,7 @@ def check_eligibility():
     product_type = data.get('product_type')
     
     # Get user accounts and balance
-    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    accounts = request_cache.user_accounts(current_user.id)
     total_balance = sum(acc.balance for acc in accounts)
     
     # Simple eligibility logic (would be AI-powered in production)
@@ -0,0 +1,40 @@
+import json
+
+from flask import Blueprint, Response, current_app, jsonify
+from flask_login import login_required, current_user
+
+from app.events import event_bus
+
+stream_bp = Blueprint('stream', __name__, url_prefix='/stream')
+
+
+def _format(event_id: int, event_type: str, data: dict) -> str:
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+
+@stream_bp.route('/events')
+@login_required
+def events():
+    """Server-Sent Events: balance, transaction and insight updates for the current user"""
+    bus = event_bus()
+    subscription = bus.subscribe(current_user.id)
+    if subscription is None:
+        return jsonify({'error': 'Too many open event streams'}), 429
+    heartbeat = current_app.config.get('EVENT_STREAM_HEARTBEAT', 15.0)
+
+    # The generator outlives the request context, so it only touches the
+    # subscription; the database session is released as usual.
+    def generate():
+        yield 'retry: 5000\n\n'
+        while True:
+            item = subscription.get(timeout=heartbeat)
+            yield ': heartbeat\n\n' if item is None else _format(*item)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Released when the server closes the response, which also happens when
+    # the client goes away before the generator has started
+    response.call_on_close(lambda: bus.unsubscribe(subscription))
+    return response
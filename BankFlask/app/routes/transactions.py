@@ -1,20 +1,33 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.models import Transaction, Account, User
-from app import db
-from datetime import datetime
+from app.ledger import LedgerService, InsufficientFundsError
+from app.pagination import keyset_paginate, InvalidCursorError
+from app.exports import export_rows, to_csv, to_ndjson
+from app.timestamps import parse_timestamp
+from app.account_directory import account_directory
+from app.conditional import etag_by_data_version
+from app import rollups
+from app.db_routing import read_only
+from datetime import datetime, timedelta
 
 transactions_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
 
 @transactions_bp.route('/')
 @login_required
 def history():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 20
     
-    transactions = Transaction.query.filter_by(user_id=current_user.id)\
-        .order_by(Transaction.created_at.desc())\
-        .paginate(page=page, per_page=per_page)
+    try:
+        transactions = keyset_paginate(
+            Transaction.query.filter_by(user_id=current_user.id),
+            Transaction.created_at, Transaction.id,
+            cursor=cursor, per_page=per_page,
+            total=rollups.total_count(current_user.id)
+        )
+    except InvalidCursorError:
+        return redirect(url_for('transactions.history'))
     
     return render_template('transactions/history.html', transactions=transactions)
 
@@ -35,8 +48,10 @@ def transfer():
             flash('Amount must be greater than 0', 'danger')
             return render_template('transactions/transfer.html')
         
-        # Find recipient
-        recipient_user = User.query.filter_by(account_number=recipient).first()
+        # Find recipient (the directory rules out unknown numbers before the lookup)
+        recipient_user = None
+        if account_directory().may_exist(recipient):
+            recipient_user = User.query.filter_by(account_number=recipient).first()
         if not recipient_user:
             flash('Recipient account not found', 'danger')
             return render_template('transactions/transfer.html')
@@ -45,38 +60,22 @@ def transfer():
             flash('Cannot transfer to your own account', 'danger')
             return render_template('transactions/transfer.html')
         
-        # Check balance
         account = Account.query.filter_by(user_id=current_user.id).first()
-        if account.balance < amount:
-            flash('Insufficient balance', 'danger')
+        recipient_account = Account.query.filter_by(user_id=recipient_user.id).first()
+        if not account or not recipient_account:
+            flash('Account not found', 'danger')
             return render_template('transactions/transfer.html')
         
-        # Create transaction
         try:
-            # Debit from sender
-            account.balance -= amount
-            
-            # Credit to recipient
-            recipient_account = Account.query.filter_by(user_id=recipient_user.id).first()
-            recipient_account.balance += amount
-            
-            # Create transaction records
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                transaction_type='TRANSFER',
-                status='COMPLETED',
-                description=description or f'Transfer to {recipient_user.full_name}',
-                from_account=current_user.account_number,
-                to_account=recipient
-            )
-            db.session.add(transaction)
-            db.session.commit()
+            LedgerService.transfer(current_user.id, account, recipient_account, amount,
+                                   description or f'Transfer to {recipient_user.full_name}')
             
             flash('Transfer completed successfully', 'success')
             return redirect(url_for('transactions.history'))
+        except InsufficientFundsError:
+            flash('Insufficient balance', 'danger')
+            return render_template('transactions/transfer.html')
         except Exception as e:
-            db.session.rollback()
             flash('An error occurred during the transfer', 'danger')
             return render_template('transactions/transfer.html')
     
@@ -93,39 +92,98 @@ def deposit():
             flash('Please enter a valid amount', 'danger')
             return render_template('transactions/deposit.html')
         
+        account = Account.query.filter_by(user_id=current_user.id).first()
+        if not account:
+            flash('Account not found', 'danger')
+            return render_template('transactions/deposit.html')
+        
         try:
-            account = Account.query.filter_by(user_id=current_user.id).first()
-            account.balance += amount
-            
-            transaction = Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                transaction_type='DEPOSIT',
-                status='COMPLETED',
-                description=description or 'Account deposit',
-                to_account=current_user.account_number
-            )
-            db.session.add(transaction)
-            db.session.commit()
+            LedgerService.deposit(current_user.id, account, amount, description or 'Account deposit')
             
             flash('Deposit successful', 'success')
             return redirect(url_for('transactions.history'))
         except Exception as e:
-            db.session.rollback()
             flash('An error occurred', 'danger')
     
     return render_template('transactions/deposit.html')
 
 @transactions_bp.route('/api/recent')
 @login_required
+@etag_by_data_version
 def api_recent():
-    transactions = Transaction.query.filter_by(user_id=current_user.id)\
-        .order_by(Transaction.created_at.desc()).limit(10).all()
+    """Newest transactions first; older pages via the cursors in the Link header"""
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
     
-    return jsonify([{
+    try:
+        page = keyset_paginate(
+            Transaction.query.filter_by(user_id=current_user.id),
+            Transaction.created_at, Transaction.id,
+            cursor=request.args.get('cursor'), per_page=limit,
+            total=rollups.total_count(current_user.id) if request.args.get('with_total') else None
+        )
+    except InvalidCursorError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    response = jsonify([{
         'id': t.id,
         'amount': t.amount,
         'type': t.transaction_type,
         'description': t.description,
         'created_at': t.created_at.isoformat()
-    } for t in transactions])
+    } for t in page.items])
+    
+    links = []
+    if page.has_next:
+        links.append(f'<{url_for("transactions.api_recent", cursor=page.next_cursor, limit=limit)}>; rel="next"')
+    if page.has_prev:
+        links.append(f'<{url_for("transactions.api_recent", cursor=page.prev_cursor, limit=limit)}>; rel="prev"')
+    if links:
+        response.headers['Link'] = ', '.join(links)
+    if page.total is not None:
+        response.headers['X-Total-Count'] = str(page.total)
+    return response
+
+@transactions_bp.route('/export')
+@login_required
+@read_only
+def export():
+    """Stream the user's transactions (or one account's postings) as CSV or NDJSON.
+
+    Query args: format=csv|ndjson, account_id, start and end (ISO dates or
+    timestamps; a date-only end includes that whole day).
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    try:
+        start = request.args.get('start')
+        start = parse_timestamp(start) if start else None
+        end = request.args.get('end')
+        if end:
+            end_is_date = len(end) == 10
+            end = parse_timestamp(end)
+            if end_is_date:
+                end += timedelta(days=1)
+        else:
+            end = None
+    except ValueError:
+        return jsonify({'error': 'start and end must be ISO dates'}), 400
+    
+    account_id = request.args.get('account_id', type=int)
+    if account_id is not None:
+        account = Account.query.get_or_404(account_id)
+        if account.user_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+    
+    rows = export_rows(current_user.id, account_id=account_id, start=start, end=end)
+    if fmt == 'csv':
+        body, mimetype = to_csv(rows), 'text/csv'
+    else:
+        body, mimetype = to_ndjson(rows), 'application/x-ndjson'
+    
+    filename = f"transactions-{datetime.utcnow():%Y%m%d}.{fmt}"
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,115 @@
+"""
+Slow Query Log - Statements over a time threshold, with their query plans
+Each slow statement is logged with its calling endpoint, parameter types
+and the database's plan (EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere),
+and aggregated by normalized statement so the worst offenders surface.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import has_request_context, request
+
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+SORT_KEYS = ('total_ms', 'max_ms', 'count', 'last_seen')
+
+
+def parameter_shape(parameters) -> str:
+    """Types of the bound parameters, e.g. '(int, str, datetime)'"""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+def explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """The plan for `statement`, fetched on a raw cursor so it is not instrumented"""
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE')):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as exc:
+        return [f'(EXPLAIN failed: {exc})']
+    finally:
+        cursor.close()
+    if conn.dialect.name == 'sqlite':
+        # (id, parent, notused, detail): indent by depth in the plan tree
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
+    return [' '.join(str(col) for col in row) for row in rows]
+
+
+class SlowQueryLog:
+    """Slow statements aggregated by shape, bounded to `max_entries` shapes"""
+
+    def __init__(self, threshold_ms: float, max_entries: int = 200):
+        self.threshold = threshold_ms / 1000
+        self.max_entries = max_entries
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, conn, statement: str, parameters, executemany: bool,
+                elapsed: float, shape: str, logger) -> None:
+        if elapsed < self.threshold:
+            return
+        endpoint = (request.endpoint or request.path) if has_request_context() else None
+        with self._lock:
+            entry = self._entries.get(shape)
+            needs_plan = entry is None
+        # EXPLAIN outside the lock; only the first sighting of a shape pays for it
+        plan = None if executemany or not needs_plan else explain(conn, statement, parameters)
+        elapsed_ms = elapsed * 1000
+
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    cheapest = min(self._entries, key=lambda key: self._entries[key]['total_ms'])
+                    del self._entries[cheapest]
+                entry = self._entries[shape] = {
+                    'statement': shape,
+                    'parameters': parameter_shape(parameters),
+                    'plan': plan,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'endpoints': {},
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['last_seen'] = datetime.utcnow().isoformat()
+            if endpoint:
+                entry['endpoints'][endpoint] = entry['endpoints'].get(endpoint, 0) + 1
+            plan = entry['plan']
+
+        logger.warning('Slow query (%.1f ms) in %s: %s | params %s | plan: %s',
+                       elapsed_ms, endpoint or '-', shape[:500], parameter_shape(parameters),
+                       ' / '.join(plan) if plan else 'n/a')
+
+    def worst(self, sort: str = 'total_ms', limit: int = 50) -> List[dict]:
+        """Aggregated entries, worst first by `sort`"""
+        if sort not in SORT_KEYS:
+            sort = 'total_ms'
+        with self._lock:
+            entries = [dict(entry, endpoints=dict(entry['endpoints']),
+                            avg_ms=entry['total_ms'] / entry['count'])
+                       for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry[sort], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,91 @@
+"""
+Balance Snapshots - End-of-day balances for historical balance lookups
+A snapshot for day D holds the balance at midnight ending D, so the
+balance at any instant is the nearest snapshot plus a few hours of postings.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import func, insert, select, literal, and_, exists
+
+from app import db
+from app.models import Account, Posting, BalanceSnapshot
+
+
+def _cutoff(snapshot_date: date) -> datetime:
+    """Instant a snapshot for snapshot_date is taken at (start of the next day)"""
+    return datetime.combine(snapshot_date + timedelta(days=1), time.min)
+
+
+def _posted_between(account_id: int, start: datetime, end: Optional[datetime] = None) -> float:
+    """Net postings for an account with start <= created_at < end"""
+    query = db.session.query(func.coalesce(func.sum(Posting.amount), 0.0)).filter(
+        Posting.account_id == account_id,
+        Posting.created_at >= start
+    )
+    if end is not None:
+        query = query.filter(Posting.created_at < end)
+    return query.scalar()
+
+
+def take_snapshots(snapshot_date: Optional[date] = None) -> int:
+    """Record end-of-day balances for every account in one INSERT ... SELECT.
+
+    Defaults to yesterday (UTC). Each balance is the live balance minus the
+    postings made since the cutoff, so the job may run at any time after
+    midnight. Accounts that already have a snapshot for the day are skipped.
+    Returns the number of snapshots written.
+    """
+    if snapshot_date is None:
+        snapshot_date = datetime.utcnow().date() - timedelta(days=1)
+    cutoff = _cutoff(snapshot_date)
+
+    posted_since = (
+        select(func.coalesce(func.sum(Posting.amount), 0.0))
+        .where(Posting.account_id == Account.id, Posting.created_at >= cutoff)
+        .scalar_subquery()
+    )
+    already_taken = exists().where(and_(
+        BalanceSnapshot.account_id == Account.id,
+        BalanceSnapshot.snapshot_date == snapshot_date
+    ))
+    rows = (
+        select(Account.id, literal(snapshot_date), Account.balance - posted_since, literal(datetime.utcnow()))
+        .where(Account.created_at < cutoff, ~already_taken)
+    )
+    result = db.session.execute(
+        insert(BalanceSnapshot).from_select(
+            ['account_id', 'snapshot_date', 'balance', 'created_at'], rows
+        )
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def balance_as_of(account: Account, ts: datetime) -> float:
+    """Balance of an account at instant ts (naive UTC), postings at ts included.
+
+    Uses the latest snapshot taken at or before ts plus the postings since it,
+    falling back to the next snapshot after ts and finally to the live balance
+    minus the postings made after ts.
+    """
+    if account.created_at and ts < account.created_at:
+        return 0.0
+    end = ts + timedelta(microseconds=1)
+
+    before = BalanceSnapshot.query.filter(
+        BalanceSnapshot.account_id == account.id,
+        BalanceSnapshot.snapshot_date <= ts.date() - timedelta(days=1)
+    ).order_by(BalanceSnapshot.snapshot_date.desc()).first()
+    if before is not None:
+        return before.balance + _posted_between(account.id, _cutoff(before.snapshot_date), end)
+
+    after = BalanceSnapshot.query.filter(
+        BalanceSnapshot.account_id == account.id,
+        BalanceSnapshot.snapshot_date >= ts.date()
+    ).order_by(BalanceSnapshot.snapshot_date.asc()).first()
+    if after is not None:
+        return after.balance - _posted_between(account.id, end, _cutoff(after.snapshot_date))
+
+    return account.balance - _posted_between(account.id, end)
@@ -0,0 +1,144 @@
+"""
+Summary Cache - Per-user financial summaries reused across requests
+Entries are keyed by the user's data version, which is bumped after any
+commit that touched one of their accounts, transactions or insights, so a
+cached summary is never served past a change made in this process.
+Changes made by other worker processes are picked up once an entry's TTL
+runs out.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, TypeVar
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app.db_routing import RoutingSession
+from app.metrics import register_gauge
+from app.models import Account, Transaction, AIInsight
+
+T = TypeVar('T')
+TRACKED_MODELS = (Account, Transaction, AIInsight)
+_CHANGED_USERS = 'summary_cache_changed_users'
+
+
+class SummaryCache:
+    """LRU of per-user values, invalidated by bumping the user's version"""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_ids: Iterable[int]) -> None:
+        """Invalidate everything cached for these users"""
+        with self._lock:
+            for user_id in user_ids:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                self.invalidations += 1
+
+    def get_or_compute(self, user_id: int, key: Hashable, loader: Callable[[], T]) -> T:
+        """The cached value of `key` for this user, calling loader() on a miss"""
+        if not self.max_entries:
+            return loader()
+        version = self.version(user_id)
+        cache_key = (user_id, version, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            # A commit during loader() may have bumped the version; the
+            # entry is then simply unreachable and ages out of the LRU.
+            self._entries[cache_key] = (now, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+def summary_cache() -> SummaryCache:
+    """The current app's cache, created on first use"""
+    cache = current_app.extensions.get('summary_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('summary_cache', SummaryCache(
+            max_entries=current_app.config.get('SUMMARY_CACHE_MAX_ENTRIES', 2048),
+            ttl=current_app.config.get('SUMMARY_CACHE_TTL', 30.0)
+        ))
+    return cache
+
+
+def cached(user_id: int, key: Hashable, loader: Callable[[], T]) -> T:
+    if not has_app_context():
+        return loader()
+    return summary_cache().get_or_compute(user_id, key, loader)
+
+
+register_gauge('bank_summary_cache_entries', 'Per-user summaries held in the summary cache.',
+               lambda: summary_cache().stats()['entries'])
+register_gauge('bank_summary_cache_hit_ratio', 'Summary cache hits over lookups since start or reset.',
+               lambda: summary_cache().stats()['hit_rate'])
+
+
+# ----- invalidation -----
+
+def mark_changed(session, *user_ids: int) -> None:
+    """Record users whose data the session's pending transaction changes.
+
+    Needed for Core UPDATE/INSERT statements; ORM changes to the tracked
+    models are picked up at flush.
+    """
+    session.info.setdefault(_CHANGED_USERS, set()).update(uid for uid in user_ids if uid is not None)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, TRACKED_MODELS):
+            mark_changed(session, obj.user_id)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _bump_versions(session):
+    changed = session.info.pop(_CHANGED_USERS, None)
+    if changed and has_app_context():
+        summary_cache().bump(changed)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_changes(session):
+    session.info.pop(_CHANGED_USERS, None)
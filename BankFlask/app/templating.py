@@ -0,0 +1,60 @@
+"""
+Template Compilation - Persistent Jinja bytecode cache and boot-time warm-up
+Compiled templates are written to a directory shared by every worker
+(<instance>/jinja_cache unless JINJA_BYTECODE_CACHE_DIR is set), so a new
+process loads bytecode instead of parsing the sources again. Entries are
+keyed by template name and checked against a hash of the source, so an
+edited template is recompiled on its next load. With JINJA_WARMUP on,
+every template is loaded while the app is created, before the first
+request.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+logger = logging.getLogger(__name__)
+
+
+def cache_dir(app) -> str:
+    return app.config.get('JINJA_BYTECODE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+
+
+def warm_up(app) -> Tuple[int, List[str]]:
+    """Load every template once; returns (templates loaded, names that failed)"""
+    env = app.jinja_env
+    loaded, failed = 0, []
+    for name in env.list_templates():
+        try:
+            env.get_template(name)
+            loaded += 1
+        except TemplateError:
+            logger.warning('Template %s failed to compile', name, exc_info=True)
+            failed.append(name)
+    return loaded, failed
+
+
+def stats(app) -> Dict[str, object]:
+    directory = cache_dir(app)
+    files = os.listdir(directory) if os.path.isdir(directory) else []
+    return {
+        'enabled': app.jinja_env.bytecode_cache is not None,
+        'directory': directory,
+        'entries': len(files),
+        'bytes': sum(os.path.getsize(os.path.join(directory, name)) for name in files),
+    }
+
+
+def init_app(app) -> None:
+    if app.config.get('JINJA_BYTECODE_CACHE', True):
+        directory = cache_dir(app)
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    if app.config.get('JINJA_WARMUP'):
+        started = time.perf_counter()
+        loaded, failed = warm_up(app)
+        logger.info('Warmed %d templates in %.0f ms (%d failed)',
+                    loaded, (time.perf_counter() - started) * 1000, len(failed))
@@ -0,0 +1,19 @@
+"""
+Timestamps - Parsing client-supplied ISO times into the stored form
+Every DateTime column holds naive UTC, so a timestamp that carries an
+offset is converted to UTC and stripped before it is compared with one.
+"""
+
+from datetime import datetime, timezone
+
+
+def to_naive_utc(ts: datetime) -> datetime:
+    """ts as naive UTC; naive values are assumed to be UTC already"""
+    if ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """An ISO date or timestamp as naive UTC; raises ValueError if malformed"""
+    return to_naive_utc(datetime.fromisoformat(value))
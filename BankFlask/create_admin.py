@@ -4,7 +4,7 @@ from app.routes.auth import generate_account_number
 
 app = create_app()
 with app.app_context():
-    db.create_all()
+    db.create_all(bind_key=None)
     # Check if user with id=1 exists
     existing = User.query.get(1)
     if existing:
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, Account
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App bound to a throwaway SQLite file with one user and two accounts"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'ledger.db'}",
+        # A file database gets a real pool, unlike the profile's in-memory default
+        'SQLALCHEMY_ENGINE_OPTIONS': dict(Config.SQLALCHEMY_ENGINE_OPTIONS),
+    }, config_name='testing')
+    with app.app_context():
+        user = User(username='ledger', email='ledger@example.com', first_name='Led',
+                    last_name='Ger', account_number='9000000000000001')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([
+            Account(user_id=user.id, account_name='A', balance=100.0, account_number='1000000000000001'),
+            Account(user_id=user.id, account_name='B', balance=0.0, account_number='1000000000000002'),
+        ])
+        db.session.commit()
+    return app
+
+
+def ledger_accounts():
+    """The fixture's two accounts, freshly loaded"""
+    return (Account.query.filter_by(account_number='1000000000000001').one(),
+            Account.query.filter_by(account_number='1000000000000002').one())
+
+
+def count_queries(engine):
+    """A list that collects every SQL statement the engine runs from now on"""
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
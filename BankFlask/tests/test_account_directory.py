@@ -0,0 +1,46 @@
+from app import db
+from app.account_directory import AccountDirectory, BloomFilter, account_directory, is_luhn_valid
+from app.models import Account, User
+
+
+def test_allocated_numbers_are_unique_luhn_valid_and_known(app):
+    with app.app_context():
+        directory = account_directory()
+        numbers = directory.allocate(3) + directory.allocate(1200)
+
+        assert len(set(numbers)) == len(numbers)
+        assert all(len(number) == 16 and is_luhn_valid(number) for number in numbers)
+
+        db.session.add(Account(user_id=1, account_name='New', account_number=numbers[0]))
+        db.session.commit()
+        assert directory.may_exist(numbers[0])
+        assert directory.may_exist('1000000000000001')  # fixture account, not Luhn-valid
+        assert not directory.may_exist('not-a-number')
+
+
+def test_directory_sees_rows_inserted_elsewhere(app):
+    with app.app_context():
+        directory = AccountDirectory()
+        assert not directory.may_exist('5555000011112222')
+
+        # Written behind the directory's back, e.g. by another worker process
+        user = User(username='other', email='other@example.com', first_name='O', last_name='T',
+                    account_number='5555000011112222', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Account(user_id=user.id, account_name='C', account_number='5555000011113333'))
+        db.session.commit()
+
+        assert directory.may_exist('5555000011112222')
+        assert directory.may_exist('5555000011113333')
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    members = [f'{i:016d}' for i in range(0, 20000, 2)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(f'{i:016d}' in bloom for i in range(1, 20000, 2))
+    assert false_positives < 300
@@ -0,0 +1,41 @@
+import pytest
+
+from app import db
+from app.ledger import LedgerService
+from conftest import count_queries, ledger_accounts
+
+POLLED = ['/dashboard/api/balance', '/accounts/api/balance/1', '/transactions/api/recent',
+          '/advisor/api/health-score', '/ai/api/recommendations']
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    return client
+
+
+@pytest.mark.parametrize('path', POLLED)
+def test_unchanged_poll_is_answered_304(app, client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag and not again.data
+
+
+def test_304_skips_the_view_and_changes_invalidate(app, client):
+    etag = client.get('/transactions/api/recent').headers['ETag']
+    with app.app_context():
+        statements = count_queries(db.engine)
+        client.get('/transactions/api/recent', headers={'If-None-Match': etag})
+        assert statements and not any('FROM transactions' in s for s in statements)
+
+        source, _ = ledger_accounts()
+        LedgerService.deposit(source.user_id, source, 5.0, 'top up')
+    changed = client.get('/transactions/api/recent', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
@@ -0,0 +1,28 @@
+import pytest
+
+from app import create_app, db
+from app.config import engine_diagnostics, get_profile, TestingConfig
+
+
+def test_sqlite_connections_get_wal_and_pragmas(app):
+    with app.app_context():
+        info = engine_diagnostics(db.engine, app.config['PROFILE_NAME'], app.config['SQLITE_PRAGMAS'])
+
+    assert info['pool']['class'] == 'QueuePool'
+    assert info['pool']['recycle'] == app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_recycle']
+    assert info['pragmas']['journal_mode'] == 'wal'
+    assert info['pragmas']['synchronous'] == 1  # NORMAL
+    assert info['pragmas']['busy_timeout'] == app.config['SQLITE_PRAGMAS']['busy_timeout']
+    assert info['pragmas']['cache_size'] == app.config['SQLITE_PRAGMAS']['cache_size']
+
+
+def test_profiles_are_selected_by_name():
+    assert get_profile('testing') is TestingConfig
+    with pytest.raises(ValueError):
+        get_profile('staging')
+
+    app = create_app(config_name='testing')
+    assert app.config['PROFILE_NAME'] == 'testing'
+    with app.app_context():
+        assert db.engine.url.database in (None, '')
+        assert db.session.execute(db.text('PRAGMA synchronous')).scalar() == 1
@@ -0,0 +1,41 @@
+import pytest
+
+from app import db
+from app.ledger import LedgerService
+from conftest import count_queries, ledger_accounts
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    return client
+
+
+def test_bundle_returns_requested_sections(app, client):
+    with app.app_context():
+        source, target = ledger_accounts()
+        LedgerService.transfer(source.user_id, source, target, 40.0, 'move')
+        LedgerService.withdraw(source.user_id, source, 10.0, 'cash')
+
+    bundle = client.get('/api/v1/dashboard').get_json()
+    assert set(bundle) == {'as_of', 'balance', 'transactions', 'recommendations',
+                           'health_score', 'summary', 'unread_insights'}
+    assert bundle['balance']['total_balance'] == 90.0
+    assert [t['type'] for t in bundle['transactions']] == ['WITHDRAWAL', 'TRANSFER']
+    assert bundle['health_score']['spending'] == bundle['summary']['spending'] == 10.0
+
+    some = client.get('/api/v1/dashboard?sections=balance,transactions&limit=1').get_json()
+    assert set(some) == {'as_of', 'balance', 'transactions'} and len(some['transactions']) == 1
+    assert client.get('/api/v1/dashboard?sections=balance,bogus').status_code == 400
+
+
+def test_bundle_reads_one_snapshot_on_one_connection(app, client):
+    with app.app_context():
+        statements = count_queries(db.engine)
+        client.get('/api/v1/dashboard')
+    begin = statements.index('BEGIN')
+    # the login user load comes first; every section reads after the BEGIN
+    assert any('FROM accounts' in s for s in statements[begin:])
+    assert any('FROM transactions' in s for s in statements[begin:])
+    assert not any('FROM transactions' in s or 'FROM ai_insights' in s for s in statements[:begin])
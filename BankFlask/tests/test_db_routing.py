@@ -0,0 +1,69 @@
+import sqlite3
+
+from flask import g
+from sqlalchemy import select, update
+
+from app import create_app, db
+from app.db_routing import READ_BIND_KEY, begin_snapshot, replica_url
+from app.models import Account
+from conftest import ledger_accounts
+
+
+def test_read_only_requests_use_the_read_engine_until_a_write(app):
+    with app.test_request_context():
+        primary, replica = db.engine, db.engines[READ_BIND_KEY]
+        assert db.session.get_bind(clause=select(Account)) is primary
+
+        g.db_read_only = True
+        assert db.session.get_bind(clause=select(Account)) is replica
+        assert db.session.get_bind(clause=update(Account)) is primary
+
+        source, _ = ledger_accounts()
+        source.balance = 90.0
+        db.session.commit()
+        # After a write the session sticks to the primary (read-your-writes)
+        assert db.session.get_bind(clause=select(Account)) is primary
+        assert ledger_accounts()[0].balance == 90.0
+
+
+def test_read_engine_rejects_writes(app):
+    with app.app_context():
+        with db.engines[READ_BIND_KEY].connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA query_only').scalar() == 1
+            try:
+                conn.exec_driver_sql("UPDATE accounts SET balance = 0")
+            except Exception as exc:
+                assert 'readonly' in str(exc) or 'read-only' in str(exc)
+            else:
+                raise AssertionError('write succeeded on the read engine')
+
+    assert replica_url('sqlite://') is None
+    assert replica_url('postgresql://db/bank') is None
+    assert 'mode=ro' in replica_url('sqlite:////tmp/bank.db')
+
+
+def test_begin_snapshot_holds_reads_steady_across_other_commits(app):
+    with app.app_context():
+        balance = select(Account.balance).where(Account.account_number == '1000000000000001')
+        begin_snapshot(db.session)
+        assert db.session.execute(balance).scalar() == 100.0
+
+        with db.engine.begin() as other:
+            other.execute(update(Account).where(Account.account_number == '1000000000000001').values(balance=5.0))
+        assert db.session.execute(balance).scalar() == 100.0
+
+        db.session.rollback()
+        assert db.session.execute(balance).scalar() == 5.0
+
+
+def test_read_engine_opens_a_replica_file_not_in_wal_mode(app, tmp_path):
+    replica = tmp_path / 'replica.db'
+    sqlite3.connect(replica).execute('CREATE TABLE accounts (id INTEGER)').connection.close()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'ledger.db'}",
+        'DATABASE_READ_URL': replica_url(f'sqlite:///{replica}'),
+    }, config_name='testing')
+    with app.app_context():
+        with db.engines[READ_BIND_KEY].connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'delete'
+            assert conn.exec_driver_sql('PRAGMA query_only').scalar() == 1
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from flask_login import login_user
+
+from app import db
+from app.events import EventBus, event_bus
+from app.ledger import LedgerService
+from app.models import AIInsight, User
+from app.routes import stream
+from conftest import ledger_accounts
+
+
+@pytest.fixture
+def client(app):
+    app.config['EVENT_STREAM_HEARTBEAT'] = 0.01
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    return client
+
+
+def read_events(chunks, count):
+    events = []
+    while len(events) < count:
+        chunk = next(chunks).decode()
+        if chunk.startswith('event:') or '\nevent:' in chunk:
+            lines = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_stream_pushes_committed_changes(app, client):
+    response = client.get('/stream/events', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.iter_encoded()
+    assert next(chunks) == b'retry: 5000\n\n'
+    assert next(chunks) == b': heartbeat\n\n'
+
+    with app.app_context():
+        source, target = ledger_accounts()
+        user_id = source.user_id
+        LedgerService.transfer(user_id, source, target, 30.0, 'move')
+        db.session.add(AIInsight(user_id=user_id, title='Tip', insight_type='TIP'))
+        db.session.commit()
+
+    events = read_events(chunks, 4)
+    assert events[0][0] == 'transaction' and events[0][1]['amount'] == 30.0
+    assert sorted(data['balance'] for kind, data in events[1:3]) == [30.0, 70.0]
+    assert events[3] == ('insight', {'id': 1, 'type': 'TIP', 'title': 'Tip', 'confidence': None})
+    response.close()
+    assert not app.extensions['event_bus'].has_subscribers(user_id)
+
+
+def test_rolled_back_changes_are_not_published(app, client):
+    response = client.get('/stream/events', buffered=False)
+    chunks = response.iter_encoded()
+    next(chunks)
+    with app.app_context():
+        source, _ = ledger_accounts()
+        with pytest.raises(Exception):
+            LedgerService.withdraw(source.user_id, source, 1000.0, 'too much')
+        LedgerService.deposit(source.user_id, source, 1.0, 'after')
+    assert read_events(chunks, 1)[0][1]['description'] == 'after'
+    response.close()
+
+
+def test_stream_closed_before_it_starts_releases_its_slot(app):
+    app.config['EVENT_STREAM_MAX_PER_USER'] = 1
+    with app.test_request_context('/stream/events'):
+        login_user(User.query.filter_by(username='ledger').one())
+        for _ in range(3):
+            # The server drops the response before asking for the first chunk
+            response = stream.events()
+            assert response.status_code == 200
+            response.close()
+        assert event_bus().connections() == 0
+
+
+def test_slow_consumer_gets_resync_and_connections_are_capped():
+    bus = EventBus(max_queued=2, max_per_user=1)
+    subscription = bus.subscribe(7)
+    assert bus.subscribe(7) is None
+    for n in range(5):
+        bus.publish(7, 'transaction', {'n': n})
+    assert subscription.get(0)[1] == 'resync'
+    assert subscription.get(0) is None
+    assert subscription.dropped == 4
+    bus.unsubscribe(subscription)
+    assert bus.subscribe(7) is not None
@@ -0,0 +1,56 @@
+import json
+from datetime import datetime
+
+from app import db, exports
+from app.ledger import LedgerService
+from app.models import Transaction
+from conftest import ledger_accounts
+
+
+def test_account_export_is_signed_and_date_filtered(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        LedgerService.transfer(a.user_id, a, b, 10.0, 'out')
+        LedgerService.deposit(a.user_id, b, 5.0, 'in')
+
+        rows = list(exports.export_rows(a.user_id, account_id=b.id))
+        assert [row[4] for row in rows] == [10.0, 5.0]
+        assert list(exports.export_rows(a.user_id, end=datetime(2000, 1, 1))) == []
+
+        lines = list(exports.to_ndjson(exports.export_rows(a.user_id, account_id=a.id)))
+        assert json.loads(lines[0])['amount'] == -10.0
+
+
+def test_encoders_stream_in_chunks(monkeypatch):
+    monkeypatch.setattr(exports, 'BATCH_SIZE', 2)
+    rows = [('t%d' % i, datetime(2026, 1, 1), 'DEPOSIT', 'COMPLETED', 1.0, 'x', None, 'acc')
+            for i in range(5)]
+
+    csv_chunks = list(exports.to_csv(iter(rows)))
+    assert csv_chunks[0].startswith('transaction_id,created_at')
+    assert len(csv_chunks) == 4
+    assert ''.join(csv_chunks).count('\n') == 6
+
+    ndjson_chunks = list(exports.to_ndjson(iter(rows)))
+    assert [chunk.count('\n') for chunk in ndjson_chunks] == [1, 2, 2]
+
+
+def test_export_window_accepts_offset_timestamps(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        LedgerService.transfer(a.user_id, a, b, 10.0, 'evening')
+        Transaction.query.one().created_at = datetime(2026, 1, 1, 22, 30)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+
+    def exported(query):
+        response = client.get(f'/transactions/export?format=ndjson&{query}')
+        assert response.status_code == 200
+        return [json.loads(line)['description'] for line in response.get_data(as_text=True).splitlines()]
+
+    # 22:30 UTC on Jan 1st is already Jan 2nd at +02:00
+    assert exported('start=2026-01-02T00:00:00%2B02:00') == ['evening']
+    assert exported('end=2026-01-02T00:00:00%2B02:00') == []
+    assert exported('end=2026-01-01T23:00:00%2B00:00') == ['evening']
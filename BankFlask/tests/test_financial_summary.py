@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.financial_summary import FinancialSummary, period_keys, spending_series
+from app.ledger import LedgerService
+from app.models import Transaction, User
+from conftest import count_queries, ledger_accounts
+
+
+def test_month_summary_matches_ledger_in_one_query(app):
+    with app.app_context():
+        user = User.query.filter_by(username='ledger').one()
+        source, _ = ledger_accounts()
+        LedgerService.deposit(user.id, source, 50.0, 'pay')
+        LedgerService.withdraw(user.id, source, 20.0, 'cash')
+        LedgerService.withdraw(user.id, source, 5.0, 'coffee')
+
+        user_id = user.id
+        statements = count_queries(db.engine)
+        summary = FinancialSummary.for_user(user_id, 'month')
+        assert len(statements) == 1
+        assert summary.spending == 25.0
+        assert summary.deposits == 50.0
+        assert summary.transaction_count == 3
+        assert summary.count_by_type == {'DEPOSIT': 1, 'WITHDRAWAL': 2}
+        assert summary.count_by_status == {'COMPLETED': 3}
+
+
+def test_rolling_window_excludes_older_transactions(app):
+    with app.app_context():
+        user = User.query.filter_by(username='ledger').one()
+        now = datetime.utcnow()
+        db.session.add_all([
+            Transaction(user_id=user.id, amount=10.0, transaction_type='PAYMENT', created_at=now - timedelta(days=5)),
+            Transaction(user_id=user.id, amount=7.0, transaction_type='PAYMENT', status='PENDING',
+                        created_at=now - timedelta(days=20)),
+            Transaction(user_id=user.id, amount=99.0, transaction_type='PAYMENT', created_at=now - timedelta(days=45)),
+            Transaction(user_id=user.id, amount=3.0, transaction_type='DEPOSIT', status=None,
+                        created_at=now - timedelta(days=1)),
+        ])
+        db.session.commit()
+
+        summary = FinancialSummary.for_user(user.id, 30, now=now)
+        assert summary.spending == 17.0
+        assert summary.amount(['PAYMENT'], status='COMPLETED') == 10.0
+        assert summary.count_by_status == {'COMPLETED': 2, 'PENDING': 1}
+        assert FinancialSummary.for_user(user.id, timedelta(days=90), now=now).spending == 116.0
+
+
+def test_spending_series_buckets_by_calendar_period(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='ledger').one().id
+        now = datetime(2026, 3, 2, 12)  # a Monday
+        db.session.add_all([
+            Transaction(user_id=user_id, amount=4.0, transaction_type='PAYMENT', created_at=datetime(2026, 3, 2, 9)),
+            Transaction(user_id=user_id, amount=6.0, transaction_type='WITHDRAWAL', created_at=datetime(2026, 3, 1, 23)),
+            Transaction(user_id=user_id, amount=1.0, transaction_type='DEPOSIT', created_at=datetime(2026, 3, 1, 8)),
+            Transaction(user_id=user_id, amount=8.0, transaction_type='PAYMENT', created_at=datetime(2026, 1, 31, 23)),
+        ])
+        db.session.commit()
+
+        weeks = spending_series(user_id, 'week', 2, now=now)
+        assert weeks == {'2026-02-23': {'WITHDRAWAL': 6.0}, '2026-03-02': {'PAYMENT': 4.0}}
+        days = spending_series(user_id, 'day', 31, now=now)
+        assert list(days)[0] == '2026-01-31' and days['2026-01-31'] == {'PAYMENT': 8.0}
+        assert period_keys('month', 3, now) == ['2026-01', '2026-02', '2026-03']
+
+
+def test_spending_chart_endpoint_validates_and_buckets(app):
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    with app.app_context():
+        source, _ = ledger_accounts()
+        LedgerService.withdraw(source.user_id, source, 12.0, 'cash')
+
+    months = client.get('/planning/api/spending-chart').get_json()
+    assert len(months) == 12 and months[-1]['spending'] == 12.0
+    weeks = client.get('/planning/api/spending-chart?granularity=week&periods=4').get_json()
+    assert len(weeks) == 4 and weeks[-1]['by_type'] == {'WITHDRAWAL': 12.0}
+    assert client.get('/planning/api/spending-chart?granularity=hour').status_code == 400
+    assert client.get('/planning/api/spending-chart?periods=0').status_code == 400
@@ -0,0 +1,44 @@
+from flask import render_template_string
+from flask_login import login_user
+
+from app.fragment_cache import FragmentCache
+from app.ledger import LedgerService
+from app.models import User
+from conftest import ledger_accounts
+
+WIDGET = "{% cache 'widget' %}<b>{{ name }}</b> {{ balance }}{% endcache %}"
+
+
+def login(client):
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+
+
+def test_fragment_reused_until_the_users_data_changes(app):
+    client = app.test_client()
+    login(client)
+    cache = app.extensions['fragment_cache']
+
+    with app.test_request_context():
+        login_user(User.query.filter_by(username='ledger').one())
+        assert render_template_string(WIDGET, name='<a>', balance=100) == '<b>&lt;a&gt;</b> 100'
+        assert render_template_string(WIDGET, name='<a>', balance=999) == '<b>&lt;a&gt;</b> 100'
+        source, _ = ledger_accounts()
+        LedgerService.deposit(source.user_id, source, 5.0, 'top up')
+        assert render_template_string(WIDGET, name='<a>', balance=105) == '<b>&lt;a&gt;</b> 105'
+    assert cache.stats()['hits'] == 1
+
+    first = client.get('/dashboard/').get_data(as_text=True)
+    with app.app_context():
+        source, _ = ledger_accounts()
+        LedgerService.withdraw(source.user_id, source, 7.0, 'lunch')
+    second = client.get('/dashboard/').get_data(as_text=True)
+    assert 'lunch' not in first and 'lunch' in second
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = FragmentCache(max_bytes=300, default_ttl=60)
+    for key in ('a', 'b', 'c'):
+        cache.get_or_render(key, None, lambda: key * 100)
+    assert cache.stats()['evictions'] >= 1
+    assert cache.stats()['bytes'] <= 300
+    assert cache.get_or_render('c', None, lambda: 'reloaded') == 'c' * 100
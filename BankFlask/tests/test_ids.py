@@ -0,0 +1,33 @@
+import threading
+
+from app.ids import ULID_LENGTH, id_timestamp, new_id
+from app.ledger import LedgerService
+from conftest import ledger_accounts
+
+
+def test_ids_are_unique_and_increasing_across_threads():
+    batches = []
+
+    def generate():
+        batches.append([new_id() for _ in range(5000)])
+
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for batch in batches:
+        assert batch == sorted(batch)
+    assert len({i for batch in batches for i in batch}) == 20000
+
+
+def test_transactions_get_time_ordered_ids(app):
+    with app.app_context():
+        source, target = ledger_accounts()
+        first = LedgerService.transfer(source.user_id, source, target, 10.0, 'first')
+        second = LedgerService.withdraw(source.user_id, source, 5.0, 'second')
+
+        assert len(first.transaction_id) == ULID_LENGTH
+        assert first.transaction_id < second.transaction_id
+        assert abs((id_timestamp(first.transaction_id) - first.created_at).total_seconds()) < 1
@@ -0,0 +1,134 @@
+import io
+
+from app import db, rollups
+from app.imports import CHUNK_SIZE, import_file
+from app.models import Transaction, Posting, User
+from conftest import ledger_accounts
+
+CSV = """account_number,date,amount,type,description,transaction_id
+1000000000000001,2026-01-05,250.00,,Salary,imp-1
+1000000000000001,2026-01-06T10:30:00,-40.5,PAYMENT,Groceries,imp-2
+1000000000000002,2026-01-07,12,,Interest,
+9999999999999999,2026-01-07,12,,Nobody,
+1000000000000001,not-a-date,5,,Broken,
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><BANKID>1<ACCTID>1000000000000002<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260210120000.000[-5:EST]<TRNAMT>-20.00<FITID>ofx-1<NAME>Coffee</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260211
+<TRNAMT>100.00
+<FITID>ofx-2
+<MEMO>Refund
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_csv_import_inserts_valid_rows_and_updates_balances(app):
+    with app.app_context():
+        result = import_file(io.StringIO(CSV), 'csv', chunk_size=2)
+        assert (result.rows, result.inserted, result.skipped) == (5, 3, 2)
+        assert [line for line, _ in result.errors] == [5, 6]
+
+        a, b = ledger_accounts()
+        assert a.balance == 100.0 + 250.0 - 40.5
+        assert b.balance == 12.0
+        assert Posting.query.count() == 3
+        assert Transaction.query.filter_by(transaction_id='imp-2').one().transaction_type == 'PAYMENT'
+        assert rollups.monthly_series(a.user_id, months=1200)['2026-01'] == 40.5
+
+        again = import_file(io.StringIO(CSV), 'csv')
+        assert again.inserted == 1  # only the row without a transaction_id
+        assert again.skipped == 4
+
+
+def test_ofx_import_and_owner_restriction(app):
+    with app.app_context():
+        assert import_file(io.StringIO(OFX), 'ofx', owner_id=999).inserted == 0
+
+        result = import_file(io.StringIO(OFX), 'ofx')
+        assert result.inserted == 2
+        _, b = ledger_accounts()
+        assert b.balance == 80.0
+        coffee = Transaction.query.filter_by(transaction_id='ofx-1').one()
+        assert (coffee.transaction_type, coffee.amount, coffee.description) == ('WITHDRAWAL', 20.0, 'Coffee')
+
+
+def test_chunk_that_would_overdraw_is_rejected_whole(app):
+    rows = """account_number,date,amount,description
+1000000000000001,2026-01-05,1000000,Windfall
+1000000000000001,2026-01-06,-5000000,Vanished
+1000000000000002,2026-01-07,12,Interest
+1000000000000001,2026-01-08,-30,Lunch
+"""
+    with app.app_context():
+        result = import_file(io.StringIO(rows), 'csv', chunk_size=2)
+        assert (result.rows, result.inserted, result.skipped) == (4, 2, 2)
+        assert [line for line, _ in result.errors] == [2, 3]
+        assert 'overdraw account 1000000000000001' in result.errors[0][1]
+
+        a, b = ledger_accounts()
+        assert (a.balance, b.balance) == (70.0, 12.0)
+        assert Transaction.query.count() == 2
+        assert rollups.monthly_series(a.user_id, months=1200)['2026-01'] == 30.0
+
+
+def test_http_import_is_admin_only(app):
+    with app.app_context():
+        user = User(username='customer', email='customer@example.com', first_name='Cus',
+                    last_name='Tomer', account_number='9000000000000002')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+    csv_file = b"account_number,date,amount\n1000000000000001,2026-01-05,1000000\n"
+    client = app.test_client()
+    client.post('/login', data={'username': 'customer', 'password': 'password123'})
+    response = client.post('/admin/api/transactions/import',
+                           data={'file': (io.BytesIO(csv_file), 'rows.csv')})
+    assert response.status_code == 403
+    assert client.post('/transactions/import', data={'file': (io.BytesIO(csv_file), 'rows.csv')}).status_code == 404
+
+    client.get('/logout')
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    response = client.post('/admin/api/transactions/import',
+                           data={'file': (io.BytesIO(csv_file), 'rows.csv')})
+    assert response.status_code == 200 and response.get_json()['inserted'] == 1
+
+
+def test_non_finite_amounts_are_rejected(app):
+    rows = """account_number,date,amount
+1000000000000001,2026-01-05,inf
+1000000000000001,2026-01-05,nan
+1000000000000001,2026-01-05,-inf
+"""
+    ofx = OFX.replace('<TRNAMT>-20.00', '<TRNAMT>nan').replace('<TRNAMT>100.00', '<TRNAMT>inf')
+    with app.app_context():
+        result = import_file(io.StringIO(rows), 'csv')
+        assert (result.inserted, result.skipped) == (0, 3)
+        assert {message for _, message in result.errors} == {'Amount must be a finite number'}
+
+        result = import_file(io.StringIO(ofx), 'ofx')
+        assert (result.inserted, result.skipped) == (0, 2)
+
+        a, b = ledger_accounts()
+        assert (a.balance, b.balance) == (100.0, 0.0)
+        assert Transaction.query.count() == 0
+
+
+def test_http_import_with_a_late_decode_error_writes_nothing(app):
+    rows = ''.join(f'1000000000000001,2026-01-05,1,,row {i},late-{i}\n' for i in range(2 * CHUNK_SIZE))
+    body = b'account_number,date,amount,type,description,transaction_id\n' + rows.encode() + b'\xff\n'
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    response = client.post('/admin/api/transactions/import',
+                           data={'file': (io.BytesIO(body), 'rows.csv')})
+    assert response.status_code == 400
+    with app.app_context():
+        assert Transaction.query.count() == 0
+        assert ledger_accounts()[0].balance == 100.0
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from app import db
+from app.models import Transaction, Posting
+from app.ledger import LedgerService, LedgerError, InsufficientFundsError
+from conftest import ledger_accounts
+
+
+def test_transfer_moves_funds_and_records_transaction(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        LedgerService.transfer(a.user_id, a, b, 40.0, 'rent')
+        a, b = ledger_accounts()
+        assert a.balance == 60.0
+        assert b.balance == 40.0
+        txn = Transaction.query.one()
+        assert (txn.from_account, txn.to_account, txn.amount) == (a.account_number, b.account_number, 40.0)
+        legs = {p.account_id: p.amount for p in txn.postings}
+        assert legs == {a.id: -40.0, b.id: 40.0}
+
+
+def test_overdraft_is_rejected_without_side_effects(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        with pytest.raises(InsufficientFundsError):
+            LedgerService.transfer(a.user_id, a, b, 150.0, 'too much')
+        with pytest.raises(LedgerError):
+            LedgerService.deposit(a.user_id, a, 0, 'zero')
+        for amount in (float('inf'), float('nan')):
+            with pytest.raises(LedgerError):
+                LedgerService.deposit(a.user_id, a, amount, 'not a number')
+        a, b = ledger_accounts()
+        assert (a.balance, b.balance) == (100.0, 0.0)
+        assert Transaction.query.count() == 0
+        assert Posting.query.count() == 0
+
+
+def test_backfill_postings_is_idempotent(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        db.session.add(Transaction(user_id=a.user_id, amount=25.0, transaction_type='TRANSFER',
+                                   from_account=a.account_number, to_account=b.account_number))
+        db.session.commit()
+        assert LedgerService.backfill_postings() == 2
+        assert LedgerService.backfill_postings() == 0
+        assert sorted(p.amount for p in Posting.query) == [-25.0, 25.0]
+
+
+def test_concurrent_withdrawals_never_overdraw(app):
+    errors = []
+
+    def withdraw():
+        with app.app_context():
+            a, _ = ledger_accounts()
+            try:
+                LedgerService.withdraw(a.user_id, a, 30.0, 'atm')
+            except InsufficientFundsError:
+                errors.append(True)
+
+    threads = [threading.Thread(target=withdraw) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        a, _ = ledger_accounts()
+        assert a.balance == 10.0
+        assert Transaction.query.count() == 3
+        assert len(errors) == 2
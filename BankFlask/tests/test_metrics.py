@@ -0,0 +1,39 @@
+import json
+import threading
+
+from app import metrics
+
+
+def test_histogram_buckets_are_cumulative_across_threads():
+    def work():
+        metrics.observe_request('probe.hist', 'GET', 200, 0.003, db_seconds=0.001, db_queries=2)
+        metrics.observe_request('probe.hist', 'GET', 500, 0.2)
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = metrics.render(metrics.snapshot())
+    assert 'http_requests_total{endpoint="probe.hist",method="GET",status="200"} 3' in text
+    assert 'http_request_errors_total{endpoint="probe.hist"} 3' in text
+    assert 'http_request_duration_seconds_bucket{endpoint="probe.hist",le="0.005"} 3' in text
+    assert 'http_request_duration_seconds_bucket{endpoint="probe.hist",le="0.1"} 3' in text
+    assert 'http_request_duration_seconds_bucket{endpoint="probe.hist",le="0.25"} 6' in text
+    assert 'http_request_duration_seconds_bucket{endpoint="probe.hist",le="+Inf"} 6' in text
+    assert 'http_request_db_queries_total{endpoint="probe.hist"} 6' in text
+
+
+def test_metrics_endpoint_token_and_worker_aggregation(app, tmp_path):
+    app.config.update(METRICS_TOKEN='scrape', METRICS_DIR=str(tmp_path))
+    (tmp_path / '999999.json').write_text(json.dumps([[['requests', 'probe.other', 'GET', '200'], 4]]))
+    client = app.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    client.get('/api/v1/health')
+    body = client.get('/metrics', headers={'Authorization': 'Bearer scrape'}).get_data(as_text=True)
+
+    assert 'http_requests_total{endpoint="probe.other",method="GET",status="200"} 4' in body
+    assert 'http_requests_total{endpoint="api.health_check",method="GET",status="200"}' in body
+    assert '# TYPE bank_login_attempts_tracked gauge' in body
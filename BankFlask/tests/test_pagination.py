@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Transaction
+from app.pagination import keyset_paginate, encode_cursor, decode_cursor, InvalidCursorError
+
+
+def _page(cursor=None, per_page=3):
+    return keyset_paginate(Transaction.query, Transaction.created_at, Transaction.id,
+                           cursor=cursor, per_page=per_page)
+
+
+def test_walks_forward_and_back_without_gaps(app):
+    with app.app_context():
+        base = datetime(2026, 1, 1)
+        # Two rows share a timestamp so the id tie-breaker is exercised
+        for i in range(8):
+            db.session.add(Transaction(user_id=1, amount=i, transaction_type='DEPOSIT',
+                                       created_at=base + timedelta(minutes=min(i, 6))))
+        db.session.commit()
+
+        first = _page()
+        assert [t.amount for t in first.items] == [7, 6, 5]
+        assert not first.has_prev
+
+        second = _page(first.next_cursor)
+        third = _page(second.next_cursor)
+        assert [t.amount for t in second.items] == [4, 3, 2]
+        assert [t.amount for t in third.items] == [1, 0]
+        assert not third.has_next
+
+        back = _page(third.prev_cursor)
+        assert [t.amount for t in back.items] == [4, 3, 2]
+        assert [t.amount for t in _page(back.prev_cursor).items] == [7, 6, 5]
+        assert not _page(back.prev_cursor).has_prev
+
+
+def test_cursor_round_trip_and_rejection():
+    ts = datetime(2026, 5, 4, 3, 2, 1, 123)
+    assert decode_cursor(encode_cursor(ts, 42, 'prev')) == (ts, 42, 'prev')
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('not-a-cursor')
@@ -0,0 +1,50 @@
+import time
+
+
+def busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def test_token_header_profiles_one_request(app, tmp_path):
+    profiler = app.extensions['request_profiler']
+    profiler.token, profiler.directory = 'secret', str(tmp_path / 'profiles')
+
+    @app.route('/_slow')
+    def slow():
+        busy(60)
+        return 'ok'
+
+    client = app.test_client()
+    assert 'X-Profile' not in client.get('/_slow').headers
+    assert 'X-Profile' not in client.get('/_slow', headers={'X-Profile-Token': 'wrong'}).headers
+
+    name = client.get('/_slow', headers={'X-Profile-Token': 'secret'}).headers['X-Profile']
+    folded = (tmp_path / 'profiles' / name).read_text()
+    assert 'busy (tests/test_profiler.py' in folded
+
+    [profile] = profiler.list_profiles()
+    assert profile['name'] == name and profile['endpoint'] == 'slow'
+    assert profile['samples'] >= 5
+
+
+def test_armed_profiles_respect_endpoint_and_rate_cap(app, tmp_path):
+    profiler = app.extensions['request_profiler']
+    profiler.directory, profiler.max_per_minute = str(tmp_path), 2
+
+    @app.route('/_a')
+    def a():
+        return 'a'
+
+    @app.route('/_b')
+    def b():
+        return 'b'
+
+    client = app.test_client()
+    profiler.arm('b', count=5)
+    assert 'X-Profile' not in client.get('/_a').headers
+    profiled = [('X-Profile' in client.get('/_b').headers) for _ in range(4)]
+
+    assert profiled == [True, True, False, False]
+    assert len(profiler.list_profiles()) == 2
@@ -0,0 +1,37 @@
+import logging
+
+from app import db
+from app.models import Account
+from app.query_stats import current_stats, statement_shape
+
+
+def test_server_timing_header_counts_queries(app):
+    @app.route('/_probe')
+    def probe():
+        for account_id in (1, 2, 1):
+            db.session.execute(db.select(Account).where(Account.id == account_id)).all()
+        assert current_stats().count == 3
+        return 'ok'
+
+    response = app.test_client().get('/_probe')
+    assert response.headers['Server-Timing'].startswith('db;dur=')
+    assert 'desc="3 queries"' in response.headers['Server-Timing']
+
+
+def test_repeated_statement_shapes_are_flagged(app, caplog):
+    app.config['QUERY_REPEAT_WARN_THRESHOLD'] = 3
+
+    @app.route('/_n_plus_one')
+    def n_plus_one():
+        for account in Account.query.all():
+            db.session.execute(db.text(f'SELECT balance FROM accounts WHERE id = {account.id}')).scalar()
+        db.session.execute(db.text('SELECT balance FROM accounts WHERE id = 1')).scalar()
+        return 'ok'
+
+    with caplog.at_level(logging.WARNING):
+        app.test_client().get('/_n_plus_one')
+
+    assert any('Possible N+1' in record.getMessage() and 'ran 3 times' in record.getMessage()
+               for record in caplog.records)
+    assert statement_shape("SELECT 1 FROM t WHERE a = 'x' AND b IN (?, ?, ?)") == \
+        'SELECT ? FROM t WHERE a = ? AND b IN (?)'
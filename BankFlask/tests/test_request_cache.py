@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app import db, request_cache
+from app.ledger import LedgerService
+from app.models import User, Account, Transaction, AIInsight
+from conftest import count_queries, ledger_accounts
+
+
+def test_lookups_run_once_per_request_and_reset_on_commit(app):
+    with app.test_request_context():
+        user = User.query.filter_by(username='ledger').one()
+        statements = count_queries(db.engine)
+
+        accounts = request_cache.user_accounts(user.id)
+        assert request_cache.user_accounts(user.id) is accounts
+        assert request_cache.total_balance(user.id) == 100.0
+        recent = request_cache.recent_transactions(user.id, 10)
+        assert request_cache.recent_transactions(user.id, 5) == recent[:5]
+        assert user.recent_transactions == recent[:5]
+        assert len(statements) == 2
+
+        source, target = ledger_accounts()
+        LedgerService.transfer(user.id, source, target, 30.0, 'move')
+        assert request_cache.total_balance(user.id) == 100.0
+        assert len(request_cache.recent_transactions(user.id)) == 1
+
+
+def test_user_relationship_loading_policy(app):
+    with app.app_context():
+        statements = count_queries(db.engine)
+        user = User.query.filter_by(username='ledger').one()
+        assert len(user.accounts) == 2
+        assert len(statements) == 2  # user + one SELECT ... IN for accounts
+
+        with pytest.raises(InvalidRequestError):
+            user.transactions
+        with pytest.raises(InvalidRequestError):
+            user.ai_insights
+
+
+def test_deleting_a_user_cascades_to_unloaded_collections(app):
+    with app.app_context():
+        source, _ = ledger_accounts()
+        user_id = source.user_id
+        LedgerService.deposit(user_id, source, 5.0, 'top up')
+        db.session.add(AIInsight(user_id=user_id, insight_type='tip', title='Save', description='More'))
+        db.session.commit()
+        db.session.remove()
+
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+        assert (Account.query.count(), Transaction.query.count(), AIInsight.query.count()) == (0, 0, 0)
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from app import db, rollups
+from app.models import Transaction, MonthlyRollup
+from app.ledger import LedgerService
+from conftest import ledger_accounts
+
+
+def test_ledger_writes_update_rollups(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        LedgerService.deposit(a.user_id, a, 50.0, 'pay')
+        LedgerService.withdraw(a.user_id, a, 20.0, 'atm')
+        LedgerService.withdraw(a.user_id, a, 5.0, 'atm')
+        LedgerService.transfer(a.user_id, a, b, 10.0, 'move')
+
+        totals = rollups.totals_by_type(a.user_id)
+        assert totals == {'DEPOSIT': (50.0, 1), 'WITHDRAWAL': (25.0, 2), 'TRANSFER': (10.0, 1)}
+        assert rollups.sum_types(totals, rollups.SPENDING_TYPES) == 25.0
+        assert list(rollups.monthly_series(a.user_id).values())[-1] == 25.0
+
+
+def test_rebuild_matches_incremental_rollups(app):
+    with app.app_context():
+        a, _ = ledger_accounts()
+        LedgerService.withdraw(a.user_id, a, 20.0, 'atm')
+        db.session.add(Transaction(user_id=a.user_id, amount=7.0, transaction_type='PAYMENT',
+                                   status='PENDING', created_at=datetime(2025, 11, 3)))
+        db.session.commit()
+        incremental = {(r.month, r.transaction_type, r.status): (r.total_amount, r.transaction_count)
+                       for r in MonthlyRollup.query}
+
+        assert rollups.rebuild() == 2
+        rebuilt = {(r.month, r.transaction_type, r.status): (r.total_amount, r.transaction_count)
+                   for r in MonthlyRollup.query}
+        assert rebuilt[('2025-11', 'PAYMENT', 'PENDING')] == (7.0, 1)
+        del rebuilt[('2025-11', 'PAYMENT', 'PENDING')]
+        assert rebuilt == incremental
+
+
+def test_recent_months_crosses_year_boundary():
+    assert rollups.recent_months(3, datetime(2026, 2, 14)) == ['2025-12', '2026-01', '2026-02']
@@ -0,0 +1,42 @@
+import logging
+
+from app import db
+from app.models import Transaction
+from app.slow_queries import parameter_shape
+
+
+def test_slow_statements_are_aggregated_with_plans(app, caplog):
+    slow_log = app.extensions['slow_query_log']
+    slow_log.threshold = 0  # treat every statement as slow
+
+    @app.route('/_scan')
+    def scan():
+        for text in ('a', 'b'):
+            Transaction.query.filter(Transaction.description == text).all()
+        return 'ok'
+
+    with caplog.at_level(logging.WARNING):
+        app.test_client().get('/_scan')
+
+    [entry] = [e for e in slow_log.worst() if 'transactions.description = ?' in e['statement']]
+    assert entry['count'] == 2
+    assert entry['endpoints'] == {'scan': 2}
+    assert entry['parameters'] == '(str)'
+    assert any('SCAN transactions' in line for line in entry['plan'])
+    assert any('Slow query' in record.getMessage() and 'SCAN transactions' in record.getMessage()
+               for record in caplog.records)
+
+
+def test_fast_statements_are_ignored_and_log_is_bounded(app):
+    slow_log = app.extensions['slow_query_log']
+    with app.app_context():
+        db.session.execute(db.text('SELECT 1')).scalar()
+    assert slow_log.worst() == []
+
+    slow_log.threshold, slow_log.max_entries = 0, 2
+    with app.app_context():
+        for n in range(3):
+            db.session.execute(db.text(f'SELECT {n} FROM accounts WHERE id = :id'), {'id': n}).all()
+            db.session.execute(db.text('SELECT count(*) FROM users')).scalar()
+    assert len(slow_log.worst()) == 2
+    assert parameter_shape({'id': 1}) == '{id: int}'
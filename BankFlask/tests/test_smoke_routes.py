@@ -2,7 +2,7 @@ from app import create_app
 
 
 def test_routes_no_server_error():
-    app = create_app()
+    app = create_app(config_name='testing')
     client = app.test_client()
     routes = [
         '/',
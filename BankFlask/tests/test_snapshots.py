@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Account, BalanceSnapshot
+from app.ledger import LedgerService
+from app.snapshots import take_snapshots, balance_as_of
+from conftest import ledger_accounts
+
+
+def _backdate(transaction, when):
+    for posting in transaction.postings:
+        posting.created_at = when
+    transaction.created_at = when
+    db.session.commit()
+
+
+def test_snapshot_and_balance_as_of(app):
+    with app.app_context():
+        a, b = ledger_accounts()
+        for account in (a, b):
+            account.created_at = datetime(2026, 1, 1)
+        db.session.commit()
+
+        _backdate(LedgerService.transfer(a.user_id, a, b, 30.0, 'day one'), datetime(2026, 3, 1, 10))
+        _backdate(LedgerService.transfer(a.user_id, a, b, 20.0, 'day two'), datetime(2026, 3, 2, 9))
+        a, b = ledger_accounts()
+
+        # Before any snapshot exists, the live balance is walked backwards
+        assert balance_as_of(a, datetime(2026, 3, 1, 12)) == 70.0
+
+        assert take_snapshots(datetime(2026, 3, 1).date()) == 2
+        assert take_snapshots(datetime(2026, 3, 1).date()) == 0
+        snap = BalanceSnapshot.query.filter_by(account_id=a.id).one()
+        assert snap.balance == 70.0
+
+        assert balance_as_of(a, datetime(2026, 2, 28)) == 100.0
+        assert balance_as_of(a, datetime(2026, 3, 1, 10)) == 70.0
+        assert balance_as_of(a, datetime(2026, 3, 2, 8)) == 70.0
+        assert balance_as_of(a, datetime(2026, 3, 2, 9)) == 50.0
+        assert balance_as_of(b, datetime(2026, 3, 5)) == 50.0
+        assert balance_as_of(a, datetime(2025, 12, 31)) == 0.0
+
+
+def test_snapshot_skips_accounts_opened_after_the_day(app):
+    with app.app_context():
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        assert take_snapshots() == 0
+        assert BalanceSnapshot.query.count() == 0
+        for account in Account.query:
+            account.created_at = datetime.utcnow() - timedelta(days=3)
+        db.session.commit()
+        assert take_snapshots() == 2
+        assert {s.snapshot_date for s in BalanceSnapshot.query} == {yesterday}
+
+
+def test_balance_api_accepts_offset_timestamps(app):
+    client = app.test_client()
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+    with app.app_context():
+        a, _ = ledger_accounts()
+        a.created_at = datetime(2026, 1, 1)
+        db.session.commit()
+        account_id = a.id
+
+    response = client.get(f'/accounts/api/balance/{account_id}?as_of=2025-12-31T23:30:00-01:00')
+    assert response.status_code == 200
+    assert response.get_json() == {'balance': 100.0, 'as_of': '2026-01-01T00:30:00'}
+    response = client.get(f'/accounts/api/balance/{account_id}?as_of=2026-01-01T00:30:00%2B01:00')
+    assert response.get_json()['balance'] == 0.0
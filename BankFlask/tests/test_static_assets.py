@@ -0,0 +1,48 @@
+import gzip
+import os
+import re
+
+from app.assets import AssetRegistry
+
+
+def login(client):
+    client.post('/login', data={'username': 'ledger', 'password': 'password123'})
+
+
+def test_pages_link_hashed_assets_served_immutable_and_compressed(app):
+    client = app.test_client()
+    login(client)
+    page = client.get('/dashboard/').get_data(as_text=True)
+    css_url = re.search(r'href="(/static/css/style\.[0-9a-f]{12}\.css)"', page).group(1)
+    assert re.search(r'src="/static/js/app\.[0-9a-f]{12}\.js"', page)
+
+    plain = client.get('/static/css/style.css').data
+    response = client.get(css_url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.mimetype == 'text/css'
+    assert gzip.decompress(response.data) == plain
+
+    identity = client.get(css_url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers and identity.data == plain
+    assert identity.headers['ETag'] != response.headers['ETag']
+    revalidated = client.get(css_url, headers={'Accept-Encoding': 'gzip',
+                                               'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_auto_reload_rehashes_edited_files(app, tmp_path):
+    static = tmp_path / 'static'
+    static.mkdir()
+    (static / 'site.css').write_text('body { color: red; }')
+    registry = AssetRegistry(str(static), auto_reload=True)
+    assert registry.register_all() == 1
+    first = registry.lookup('site.css').hashed_name
+
+    (static / 'site.css').write_text('body { color: blue; }' * 10)
+    os.utime(static / 'site.css', (0, 1))
+    second = registry.lookup('site.css').hashed_name
+    assert first != second
+    assert registry.hashed(first) is not None and registry.hashed(second).filename == 'site.css'
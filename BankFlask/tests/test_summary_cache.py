@@ -0,0 +1,57 @@
+from app import db, request_cache
+from app.financial_summary import FinancialSummary
+from app.ledger import LedgerService
+from app.models import AIInsight, User
+from app.summary_cache import SummaryCache, summary_cache
+from conftest import count_queries, ledger_accounts
+
+
+def test_summaries_are_reused_until_the_users_data_changes(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='ledger').one().id
+        source, _ = ledger_accounts()
+        LedgerService.withdraw(user_id, source, 20.0, 'cash')
+        invalidations = summary_cache().stats()['invalidations']
+
+        statements = count_queries(db.engine)
+        assert FinancialSummary.for_user(user_id, 30).spending == 20.0
+        assert FinancialSummary.for_user(user_id, 30).spending == 20.0
+        assert len(statements) == 1
+
+        source, _ = ledger_accounts()
+        LedgerService.withdraw(user_id, source, 5.0, 'coffee')
+        assert FinancialSummary.for_user(user_id, 30).spending == 25.0
+
+        db.session.add(AIInsight(user_id=user_id, title='Tip'))
+        db.session.commit()
+        assert request_cache.unread_insight_count(user_id) == 1
+
+        stats = summary_cache().stats()
+        assert stats['hits'] == 1
+        assert stats['invalidations'] == invalidations + 2
+
+
+def test_credit_to_another_users_account_invalidates_their_summary(app):
+    with app.app_context():
+        other = User(username='other', email='other@example.com', first_name='Oth',
+                     last_name='Er', account_number='9000000000000002')
+        other.set_password('password123')
+        db.session.add(other)
+        db.session.commit()
+        before = summary_cache().version(other.id)
+
+        user_id = User.query.filter_by(username='ledger').one().id
+        source, target = ledger_accounts()
+        target.user_id = other.id
+        db.session.commit()
+        LedgerService.transfer(user_id, source, target, 10.0, 'gift')
+        assert summary_cache().version(other.id) == before + 2
+
+
+def test_lru_eviction():
+    cache = SummaryCache(max_entries=2, ttl=60)
+    for key in ('a', 'b', 'a', 'c'):
+        cache.get_or_compute(1, key, lambda: key)
+    assert cache.get_or_compute(1, 'a', lambda: 'reloaded') == 'a'
+    assert cache.get_or_compute(1, 'b', lambda: 'reloaded') == 'reloaded'
+    assert cache.stats()['evictions'] == 2
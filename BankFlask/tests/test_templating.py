@@ -0,0 +1,29 @@
+from app import create_app, templating
+
+
+def test_new_app_loads_compiled_templates_from_the_shared_cache(tmp_path, monkeypatch):
+    config = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'ledger.db'}",
+        'JINJA_BYTECODE_CACHE': True,
+        'JINJA_BYTECODE_CACHE_DIR': str(tmp_path / 'jinja_cache'),
+    }
+    first = create_app(config, config_name='testing')
+    loaded, failed = templating.warm_up(first)
+    assert loaded > 50
+    assert templating.stats(first)['entries'] == loaded
+
+    # A second worker starting against the same directory only parses the
+    # sources that never compiled
+    parsed = []
+    parse = first.jinja_env.__class__._parse
+
+    def recording_parse(self, source, name, filename):
+        parsed.append(name)
+        return parse(self, source, name, filename)
+
+    monkeypatch.setattr(first.jinja_env.__class__, '_parse', recording_parse)
+    second = create_app(dict(config, JINJA_WARMUP=True), config_name='testing')
+    assert sorted(parsed) == sorted(failed)
+    second.jinja_env.get_template('dashboard/index.html')
+    assert sorted(parsed) == sorted(failed)